@@ -1,11 +1,29 @@
-import random
+import os
 from fastapi import FastAPI
-from pydantic import BaseModel
-from statistics import mean, pstdev
-from .sim_engine import Simulator, TeamState, GameState
+from pydantic import BaseModel, Field
+from typing import Literal
+from .sim_engine import TeamState, GameState, DriveTrace
+from . import metrics, snapshots
+from .config import env_true
 
 app = FastAPI(title="CFB Drive Sim API")
-sim = Simulator()
+
+# Each request captures one immutable model snapshot (app.snapshots) and runs on
+# it throughout; model updates publish a new snapshot rather than mutating the
+# live one. The first snapshot is built on first use, not at import; with
+# MODEL_COEF_SCALE or an artifact bundle it needs no DB query, and routes that
+# query the DB anyway pass `reconcile=True` to pick up the DB's coef_scale once
+# per process.
+def get_snapshot(version: str | None = None, reconcile: bool = False) -> snapshots.ModelSnapshot:
+    """The live snapshot, or an earlier one by fingerprint (for A/B runs)."""
+    if reconcile:
+        snapshots.reconcile()
+    if version is None:
+        return snapshots.current()
+    snap = snapshots.get(version)
+    if snap is None:
+        raise HTTPException(status_code=404, detail=f"Model version {version!r} is not available; see /model/versions.")
+    return snap
 
 # CORS for local React dev
 try:
@@ -20,6 +38,11 @@ try:
 except Exception:
     pass
 
+# Request latency / opt-in profiling; not installed at all unless enabled.
+_PROFILING = env_true("PROFILING_ENABLED", False)
+if metrics.ENABLED or _PROFILING:
+    app.add_middleware(metrics.MetricsMiddleware, metrics=metrics.ENABLED, profiling=_PROFILING)
+
 class TeamIn(BaseModel):
     name: str
     off_rush: float
@@ -39,8 +62,10 @@ def simulate_game(m: MatchupIn):
         home=TeamState(**m.home.model_dump()),
         away=TeamState(**m.away.model_dump()),
     )
-    result = sim.sim_game(gs, seed=m.seed)
+    snap = get_snapshot()
+    result = snap.sim.sim_game(gs, seed=m.seed)
     return {
+        "model_version": snap.fingerprint,
         "home": result.home.name,
         "away": result.away.name,
         "score_home": result.score_home,
@@ -54,58 +79,56 @@ class SeriesIn(BaseModel):
     n: int = 1000
     seed: int | None = None
     include_samples: bool = False
+    # Capture every drive: "file" (memory-mappable columns) or "db" (sim_drives table).
+    trace: Literal["file", "db"] | None = None
+    # "loop": sim_game per game; "batch": lockstep engine, one model call per drive step.
+    # Default: batch when the drive model is a trained (batched) model, else loop.
+    engine: Literal["loop", "batch"] | None = None
+    # Variance reduction (batch engine); the response adds stderr and effective sample sizes.
+    variance: Literal["antithetic", "stratified", "control", "antithetic+control", "stratified+control"] | None = None
+    # Persist per-game scores/OT as compact binary columns; fetch via /results/{id}.
+    store_samples: bool = False
+    store_margins: bool = False
+    # Run on an earlier model snapshot by fingerprint (A/B against the current one); see /model/versions.
+    model_version: str | None = None
 
 @app.post("/simulate-series")
 def simulate_series(req: SeriesIn):
-    rng = random.Random(req.seed)
-    home_scores = []
-    away_scores = []
-    ot_games = 0
-    home_wins = 0
-    for i in range(req.n):
-        s = rng.randrange(0, 10_000_000)
-        gs = GameState(
-            home=TeamState(**req.home.model_dump()),
-            away=TeamState(**req.away.model_dump()),
-        )
-        out = sim.sim_game(gs, seed=s)
-        home_scores.append(out.score_home)
-        away_scores.append(out.score_away)
-        if out.ot_periods > 0:
-            ot_games += 1
-        if out.score_home > out.score_away:
-            home_wins += 1
-    away_wins = req.n - home_wins
-
-    def q(arr, pct):
-        if not arr:
-            return None
-        srt = sorted(arr)
-        k = max(0, min(len(srt)-1, int(round((pct/100.0)*(len(srt)-1)))))
-        return srt[k]
-
-    resp = {
-        "samples": req.n,
-        "home_win_pct": home_wins/req.n,
-        "away_win_pct": away_wins/req.n,
-        "ot_rate": ot_games/req.n,
-        "mean_score_home": mean(home_scores),
-        "mean_score_away": mean(away_scores),
-        "stdev_score_home": pstdev(home_scores),
-        "stdev_score_away": pstdev(away_scores),
-        "quantiles": {
-            "home": {"p05": q(home_scores,5), "p50": q(home_scores,50), "p95": q(home_scores,95)},
-            "away": {"p05": q(away_scores,5), "p50": q(away_scores,50), "p95": q(away_scores,95)},
-        },
-    }
-    if req.include_samples and req.n <= 2000:
-        resp["samples_detail"] = {"home": home_scores, "away": away_scores}
+    from .series import run_series, summarize
+    snap = get_snapshot(req.model_version)
+    home = TeamState(**req.home.model_dump())
+    away = TeamState(**req.away.model_dump())
+    trace = DriveTrace() if req.trace else None
+    try:
+        res = run_series(snap.sim, home, away, req.n, seed=req.seed, trace=trace, engine=req.engine,
+                         variance=req.variance)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    resp = {"model_version": snap.fingerprint, **summarize(res)}
+    if req.include_samples and res.n <= 2000:
+        resp["samples_detail"] = {"home": res.home_scores, "away": res.away_scores}
+    if trace is not None:
+        from .traces import store
+        try:
+            resp["trace"] = store(trace, req.trace, meta={"home": home.name, "away": away.name, "seed": req.seed})
+        except OSError as e:
+            raise HTTPException(status_code=503, detail=f"Trace storage unavailable (set TRACE_DIR): {e}")
+    if req.store_samples:
+        from . import results
+        try:
+            resp["result"] = results.save(res, meta={"home": home.name, "away": away.name, "seed": req.seed},
+                                          margins=req.store_margins)
+        except OSError as e:
+            raise HTTPException(status_code=503, detail=f"Result storage unavailable (set RESULT_DIR): {e}")
     return resp
 from fastapi import HTTPException, Query
-from .cfbd import get as cfbd_get
+
+# DB/HTTP-backed modules (SQLAlchemy, httpx) are imported inside the routes that
+# need them so that importing this module stays cheap on serverless cold starts.
 
 @app.get("/cfbd/teams")
 async def cfbd_teams(fbs: bool = True):
+    from .cfbd import get as cfbd_get
     try:
         path = "/teams/fbs" if fbs else "/teams"
         return await cfbd_get(path)
@@ -114,6 +137,7 @@ async def cfbd_teams(fbs: bool = True):
 
 @app.get("/cfbd/games")
 async def cfbd_games(season: int = Query(..., ge=1869, le=2100), week: int | None = None, team: str | None = None):
+    from .cfbd import get as cfbd_get
     try:
         params = {"year": season}
         if week is not None:
@@ -123,15 +147,9 @@ async def cfbd_games(season: int = Query(..., ge=1869, le=2100), week: int | Non
         return await cfbd_get("/games", params=params)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
-from fastapi import HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import select
-from .db import SessionLocal, Base, engine
-from .models import Team
-from .ingest import fetch_and_store_teams, fetch_and_store_games, init_db
-
 @app.post("/ingest/teams")
 async def ingest_teams():
+    from .ingest import fetch_and_store_teams
     try:
         n = await fetch_and_store_teams()
         return {"inserted_or_updated": n}
@@ -140,12 +158,22 @@ async def ingest_teams():
 
 @app.post("/ingest/games")
 async def ingest_games(season: int = Query(..., ge=1869, le=2100), team: str | None = None, week: int | None = None):
+    from .ingest import fetch_and_store_games
     try:
         n = await fetch_and_store_games(season=season, team=team, week=week)
         return {"inserted_or_updated": n}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@app.post("/ingest/drives")
+async def ingest_drives(season: int = Query(..., ge=1869, le=2100), team: str | None = None, week: int | None = None):
+    from .ingest import fetch_and_store_drives
+    try:
+        n = await fetch_and_store_drives(season=season, team=team, week=week)
+        return {"inserted": n}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 class NamesIn(BaseModel):
     home_name: str
     away_name: str
@@ -153,7 +181,12 @@ class NamesIn(BaseModel):
 
 @app.post("/simulate-by-name")
 def simulate_by_name(names: NamesIn):
+    from sqlalchemy import select
+    from .db import SessionLocal
+    from .models import Team
+    from .ingest import init_db
     init_db()
+    snap = get_snapshot(reconcile=True)
     with SessionLocal() as sess:
         home = sess.execute(select(Team).where(Team.name == names.home_name)).scalar_one_or_none()
         away = sess.execute(select(Team).where(Team.name == names.away_name)).scalar_one_or_none()
@@ -165,8 +198,9 @@ def simulate_by_name(names: NamesIn):
         away_state = TeamState(name=away.name, off_rush=away.off_rush or 0, off_pass=away.off_pass or 0,
                                def_rush=away.def_rush or 0, def_pass=away.def_pass or 0, st=away.st or 0)
         gs = GameState(home=home_state, away=away_state)
-        out = sim.sim_game(gs, seed=names.seed)
+        out = snap.sim.sim_game(gs, seed=names.seed)
         return {
+            "model_version": snap.fingerprint,
             "home": out.home.name, "away": out.away.name,
             "score_home": out.score_home, "score_away": out.score_away,
             "ot_periods": out.ot_periods
@@ -175,13 +209,12 @@ def simulate_by_name(names: NamesIn):
 
 from typing import List
 from datetime import datetime
-from sqlalchemy import select, func
-from sqlalchemy.orm import Session
-from .models import Team, Game
-from .db import SessionLocal
 
 @app.get("/teams/search")
 def teams_search(q: str = "") -> List[dict]:
+    from sqlalchemy import select
+    from .db import SessionLocal
+    from .models import Team
     q = q.strip()
     with SessionLocal() as sess:
         stmt = select(Team).order_by(Team.name.asc())
@@ -198,6 +231,9 @@ def ratings_seed(season: int, scale: float = 10.0) -> dict:
     - Def rating ~ (league_avg_PA/G - PA/G) * scale   (so lower PA => higher rating)
     Both off_rush/off_pass set to Off rating; def_rush/def_pass set to Def rating.
     """
+    from sqlalchemy import select
+    from .db import SessionLocal
+    from .models import Team, Game
     with SessionLocal() as sess:
         # Aggregate PF/PA per team for the season
         teams = {t.team_id: {"obj": t, "pf": 0, "pa": 0, "g": 0} for t in sess.execute(select(Team)).scalars().all()}
@@ -240,21 +276,20 @@ def ratings_seed(season: int, scale: float = 10.0) -> dict:
             sess.add(t)
             updated += 1
         sess.commit()
+        if updated:
+            from .artifact import mark_stale
+            mark_stale("ratings re-seeded")
         return {"updated": updated, "avg_pf": avg_pf, "avg_pa": avg_pa, "scale": scale}
 
 
 from fastapi import Request
 import os, asyncio, datetime as _dt
 
-def _env_true(name: str, default: bool=False) -> bool:
-    v = os.getenv(name)
-    if v is None: return default
-    return v.lower() in ("1", "true", "yes", "on")
-
 @app.on_event("startup")
 async def _bootstrap_on_startup():
     # For local dev or long-lived hosts only (Vercel will cold start per request)
-    if _env_true("AUTO_BOOTSTRAP", False):
+    if env_true("AUTO_BOOTSTRAP", False):
+        from .ingest import fetch_and_store_teams, fetch_and_store_games
         try:
             await fetch_and_store_teams()
             year = _dt.datetime.utcnow().year
@@ -265,6 +300,7 @@ async def _bootstrap_on_startup():
 
 @app.get("/cron/nightly")
 async def cron_nightly(request: Request, seasons: str | None = None):
+    from .ingest import fetch_and_store_teams, fetch_and_store_games
     # Protect with CRON_SECRET if provided
     secret = os.getenv("CRON_SECRET")
     if secret:
@@ -306,10 +342,24 @@ class SeriesByNameIn(BaseModel):
     away_name: str
     n: int = 1000
     seed: int | None = None
+    include_samples: bool = False
+    trace: Literal["file", "db"] | None = None
+    engine: Literal["loop", "batch"] | None = None
+    variance: Literal["antithetic", "stratified", "control", "antithetic+control", "stratified+control"] | None = None
+    # Persist per-game scores/OT as compact binary columns; fetch via /results/{id}.
+    store_samples: bool = False
+    store_margins: bool = False
+    model_version: str | None = None
 
 @app.post("/simulate-series-by-name")
 def simulate_series_by_name(req: SeriesByNameIn):
+    from sqlalchemy import select
+    from .db import SessionLocal
+    from .models import Team
+    from .ingest import init_db
+    from .series import run_series, summarize
     init_db()
+    snap = get_snapshot(req.model_version, reconcile=True)
     with SessionLocal() as sess:
         home = sess.execute(select(Team).where(Team.name == req.home_name)).scalar_one_or_none()
         away = sess.execute(select(Team).where(Team.name == req.away_name)).scalar_one_or_none()
@@ -319,71 +369,105 @@ def simulate_series_by_name(req: SeriesByNameIn):
                                def_rush=home.def_rush or 0, def_pass=home.def_pass or 0, st=home.st or 0)
         away_state = TeamState(name=away.name, off_rush=away.off_rush or 0, off_pass=away.off_pass or 0,
                                def_rush=away.def_rush or 0, def_pass=away.def_pass or 0, st=away.st or 0)
+        home_id, away_id = home.team_id, away.team_id
     # run series using same core loop (no DB in loop)
-    import random as _rnd
-    rng = _rnd.Random(req.seed)
-    home_wins = 0
-    ot_games = 0
-    home_scores, away_scores = [], []
-    for i in range(req.n):
-        s = rng.randrange(0, 10_000_000)
-        gs = GameState(home=home_state, away=away_state)
-        out = sim.sim_game(gs, seed=s)
-        home_scores.append(out.score_home)
-        away_scores.append(out.score_away)
-        if out.ot_periods > 0: ot_games += 1
-        if out.score_home > out.score_away: home_wins += 1
-    from statistics import mean, pstdev
-    def q(arr, pct):
-        if not arr: return None
-        srt = sorted(arr)
-        k = max(0, min(len(srt)-1, int(round((pct/100.0)*(len(srt)-1)))))
-        return srt[k]
-    resp = {
-        "samples": req.n,
-        "home": req.home_name,
-        "away": req.away_name,
-        "home_win_pct": home_wins/req.n,
-        "away_win_pct": 1 - (home_wins/req.n),
-        "ot_rate": ot_games/req.n,
-        "mean_score_home": mean(home_scores),
-        "mean_score_away": mean(away_scores),
-        "stdev_score_home": pstdev(home_scores),
-        "stdev_score_away": pstdev(away_scores),
-        "quantiles": {
-            "home": {"p05": q(home_scores,5), "p50": q(home_scores,50), "p95": q(home_scores,95)},
-            "away": {"p05": q(away_scores,5), "p50": q(away_scores,50), "p95": q(away_scores,95)},
-        },
-    }
-    if req.include_samples and req.n <= 2000:
-        resp["samples_detail"] = {"home": home_scores, "away": away_scores}
+    trace = DriveTrace() if req.trace else None
+    try:
+        res = run_series(snap.sim, home_state, away_state, req.n, seed=req.seed, trace=trace, engine=req.engine,
+                         variance=req.variance)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    resp = {"model_version": snap.fingerprint, "home": req.home_name, "away": req.away_name, **summarize(res)}
+    if req.include_samples and res.n <= 2000:
+        resp["samples_detail"] = {"home": res.home_scores, "away": res.away_scores}
+    if trace is not None:
+        from .traces import store
+        try:
+            resp["trace"] = store(trace, req.trace, meta={"home": home_state.name, "away": away_state.name,
+                                                          "seed": req.seed}, home_id=home_id, away_id=away_id)
+        except OSError as e:
+            raise HTTPException(status_code=503, detail=f"Trace storage unavailable (set TRACE_DIR): {e}")
+    if req.store_samples:
+        from . import results
+        try:
+            resp["result"] = results.save(res, meta={"home": home_state.name, "away": away_state.name, "seed": req.seed},
+                                          margins=req.store_margins)
+        except OSError as e:
+            raise HTTPException(status_code=503, detail=f"Result storage unavailable (set RESULT_DIR): {e}")
     return resp
 
+@app.get("/traces/{trace_id}")
+def get_trace(trace_id: str, start: int = Query(0, ge=0), stop: int | None = Query(None, ge=0)):
+    """Read a slice of a file trace (rows [start, stop), at most 10k) via memory mapping."""
+    from .traces import load_file
+    try:
+        meta, cols = load_file(trace_id)
+    except (FileNotFoundError, NotADirectoryError):
+        raise HTTPException(status_code=404, detail="Unknown trace id (db traces live in the sim_drives table).")
+    total = meta["drives"]
+    stop = min(total, start + 10_000 if stop is None else stop, start + 10_000)
+    return {
+        "trace_id": trace_id, "games": meta["games"], "drives": total,
+        "start": start, "stop": max(start, stop), "results": meta["results"],
+        "columns": {name: col[start:stop].tolist() for name, col in cols.items()},
+    }
+
+@app.get("/results/{result_id}")
+def get_result(result_id: str):
+    """Metadata and exact per-value histograms (home, away, margin, ot) of a stored series result."""
+    from .results import summary
+    try:
+        return summary(result_id)
+    except (FileNotFoundError, NotADirectoryError):
+        raise HTTPException(status_code=404, detail="Unknown result id.")
+
+@app.get("/results/{result_id}/{column}")
+def get_result_column(result_id: str, column: Literal["home", "away", "ot", "margin"],
+                      start: int = Query(0, ge=0), stop: int | None = Query(None, ge=0),
+                      format: Literal["npy", "raw", "json"] = "npy"):
+    """Rows [start, stop) of one column: `.npy` bytes (np.load), raw little-endian bytes, or JSON (max 10k rows)."""
+    from fastapi.responses import Response
+    from .results import load, column as result_column, npy_bytes, raw_bytes
+    try:
+        meta, cols = load(result_id)
+    except (FileNotFoundError, NotADirectoryError):
+        raise HTTPException(status_code=404, detail="Unknown result id.")
+    values = result_column(cols, column)[start:stop]
+    if format == "json":
+        values = values[:10_000]
+        return {"result_id": result_id, "column": column, "start": start, "stop": start + len(values),
+                "values": values.tolist()}
+    headers = {"x-dtype": values.dtype.str, "x-rows": str(len(values)), "x-start": str(start)}
+    body = npy_bytes(values) if format == "npy" else raw_bytes(values)
+    return Response(content=body, media_type="application/octet-stream", headers=headers)
 
-from .model_params import get_params, set_param
-from .calibrate import run as calibrate_run
 
 @app.get("/model/params")
 def model_params():
+    from .model_params import get_params
     return get_params()
 
 @app.post("/model/params")
 def set_model_param(name: str, value: float):
+    from .model_params import get_params, set_param
     set_param(name, float(value))
-    # reinit simulator coefficients
-    sim.set_coef_scale(get_params().get("coef_scale", 1.0))
-    return {"ok": True, "params": get_params()}
+    # publish a new model snapshot; requests already running keep theirs
+    snap = snapshots.publish_coef_scale(get_params().get("coef_scale", 1.0), source="params")
+    return {"ok": True, "params": get_params(), "model_version": snap.fingerprint}
 
 @app.post("/model/calibrate")
 def model_calibrate(season: int, samples: int = 2000, seed: int | None = None):
+    from .model_params import get_params
+    from .calibrate import run as calibrate_run
     out = calibrate_run(season=season, samples=samples, seed=seed)
-    # refresh simulator
-    sim.set_coef_scale(get_params().get("coef_scale", 1.0))
-    return out
+    snap = snapshots.publish_coef_scale(get_params().get("coef_scale", 1.0), source="calibrate")
+    return {**out, "model_version": snap.fingerprint}
 
 
 @app.get("/cron/calibrate")
 def cron_calibrate(request: Request, season: int | None = None, samples: int = 2000):
+    from .model_params import get_params
+    from .calibrate import run as calibrate_run
     # Auth via CRON_SECRET (same as /cron/nightly)
     secret = os.getenv("CRON_SECRET")
     if secret:
@@ -396,6 +480,149 @@ def cron_calibrate(request: Request, season: int | None = None, samples: int = 2
         y = _dt.datetime.utcnow().year - 1
         season = y
     out = calibrate_run(season=season, samples=samples)
-    # refresh live sim params
-    sim.set_coef_scale(get_params().get("coef_scale", 1.0))
-    return {"ok": True, "season": season, "result": out}
+    snap = snapshots.publish_coef_scale(get_params().get("coef_scale", 1.0), source="cron_calibrate")
+    return {"ok": True, "season": season, "result": out, "model_version": snap.fingerprint}
+
+@app.get("/artifact")
+def artifact_status(verify: bool = False):
+    """The deployed artifact bundle, if any; `verify` compares it with the DB and marks it stale on mismatch."""
+    from .artifact import get_any, verify as verify_artifact
+    art = get_any()
+    if art is None:
+        return {"loaded": False}
+    if verify:
+        verify_artifact()
+    return {"loaded": True, **art.status()}
+
+@app.get("/model/versions")
+def model_versions():
+    """Retained model snapshots (newest last); series endpoints take `model_version` to run on one."""
+    return {"current": get_snapshot().fingerprint, "versions": snapshots.history()}
+
+
+class LiveStateIn(BaseModel):
+    home: TeamIn
+    away: TeamIn
+    seconds_left: int = Field(..., ge=0, le=3600)
+    score_home: int = Field(0, ge=0)
+    score_away: int = Field(0, ge=0)
+    possession: Literal["home", "away"] = "home"
+    yardline: int = Field(75, ge=1, le=99)      # yards to goal for the team with the ball
+    timeouts_home: int = Field(3, ge=0, le=3)
+    timeouts_away: int = Field(3, ge=0, le=3)
+    # games simulated when the state is off the precomputed grid
+    n_fallback: int = Field(2000, ge=100, le=50_000)
+    seed: int | None = None
+
+def _live_wp(snap: snapshots.ModelSnapshot, req: LiveStateIn) -> dict:
+    from .win_prob import LiveState, win_probability
+    state = LiveState(seconds_left=req.seconds_left, score_home=req.score_home, score_away=req.score_away,
+                      possession=req.possession, yardline=req.yardline,
+                      timeouts_home=req.timeouts_home, timeouts_away=req.timeouts_away)
+    out = win_probability(snap.model, TeamState(**req.home.model_dump()), TeamState(**req.away.model_dump()),
+                          state, n_fallback=req.n_fallback, seed=req.seed)
+    return {"model_version": snap.fingerprint, **out}
+
+@app.post("/win-probability")
+def live_win_probability(req: LiveStateIn):
+    """Home/away win probability from a mid-game state (grid lookup, simulation off-grid)."""
+    return _live_wp(get_snapshot(), req)
+
+class LiveStatesIn(BaseModel):
+    states: List[LiveStateIn] = Field(..., max_length=200)
+
+MAX_BATCH_FALLBACK_GAMES = 1_000_000
+
+@app.post("/win-probability/batch")
+def live_win_probability_batch(req: LiveStatesIn):
+    # Off-grid states simulate n_fallback games each; bound the worst case per request.
+    if sum(s.n_fallback for s in req.states) > MAX_BATCH_FALLBACK_GAMES:
+        raise HTTPException(status_code=400, detail=f"Sum of n_fallback over states exceeds {MAX_BATCH_FALLBACK_GAMES:,}.")
+    snap = get_snapshot()
+    return {"model_version": snap.fingerprint, "results": [_live_wp(snap, s) for s in req.states]}
+
+
+@app.get("/matchups/matrix")
+def matchup_matrix(conference: str | None = None, n: int = Query(1000, ge=100, le=20_000),
+                   bucket: float = Query(10.0, gt=0), seed: int | None = 0):
+    """Home win probability for every ordered pair of DB teams (row hosts column), cached by version."""
+    from .matchups import db_teams, get_matrix
+    teams = db_teams(conference)
+    if len(teams) < 2:
+        raise HTTPException(status_code=404, detail="Need at least two teams. Run /ingest/teams first or check conference.")
+    snap = get_snapshot(reconcile=True)
+    m, source = get_matrix(snap.model, teams, n_per_bucket=n, bucket=bucket, seed=seed)
+    probs = [[None if i == j else round(p, 4) for j, p in enumerate(row)] for i, row in enumerate(m.home_win.tolist())]
+    return {"model_version": snap.fingerprint, "version": m.version, "cache": source, "teams": m.names, "home_win_prob": probs, "meta": m.meta}
+
+class BracketIn(BaseModel):
+    teams: List[str]            # DB team names in seed order (1 first)
+    n: int = 1_000_000          # brackets to simulate
+    # opening rounds hosted by the better seed (at most the bracket's round count)
+    home_rounds: int = Field(1, ge=0)
+    # games per rating bucket for the pairwise matrix (same range as /matchups/matrix)
+    n_per_bucket: int = Field(1000, ge=100, le=20_000)
+    seed: int | None = None
+
+@app.post("/bracket/simulate")
+def bracket_simulate(req: BracketIn):
+    """Round-reach and title probabilities for a seeded single-elimination bracket (byes to the top seeds)."""
+    from .matchups import db_teams, get_matrix
+    from .bracket import simulate_brackets, summarize
+    if not 2 <= len(req.teams) <= 128 or len(set(req.teams)) != len(req.teams):
+        raise HTTPException(status_code=400, detail="Need 2-128 distinct team names.")
+    if not 1 <= req.n <= 10_000_000:
+        raise HTTPException(status_code=400, detail="n must be between 1 and 10,000,000.")
+    rounds = (len(req.teams) - 1).bit_length()
+    if req.home_rounds > rounds:
+        raise HTTPException(status_code=400, detail=f"home_rounds must be at most {rounds} for {len(req.teams)} teams.")
+    by_name = {t.name: t for t in db_teams()}
+    missing = [name for name in req.teams if name not in by_name]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Teams not found in DB: {missing}")
+    snap = get_snapshot(reconcile=True)
+    m, source = get_matrix(snap.model, [by_name[name] for name in req.teams], n_per_bucket=req.n_per_bucket)
+    out = summarize(req.teams, simulate_brackets(m.home_win, req.n, home_rounds=req.home_rounds, seed=req.seed))
+    return {"model_version": snap.fingerprint, **out, "matrix_version": m.version, "matrix_cache": source}
+
+class SweepAxisIn(BaseModel):
+    team: Literal["home", "away"]
+    field: Literal["off_rush", "off_pass", "def_rush", "def_pass", "st"]
+    deltas: List[float]         # rating changes to try, e.g. [-10, -5, 5, 10]
+
+class SweepIn(BaseModel):
+    home: TeamIn
+    away: TeamIn
+    axes: List[SweepAxisIn]     # grid = every combination of one delta per axis
+    n: int = Field(2000, ge=2)  # games per grid point (the same games at every point)
+    seed: int | None = None
+
+@app.post("/sweep")
+def sensitivity_sweep(req: SweepIn):
+    """Win probability and margin across a grid of rating perturbations, using common random numbers."""
+    from .sweep import Axis, run_sweep
+    axes = [Axis(a.team, a.field, a.deltas) for a in req.axes]
+    snap = get_snapshot()
+    try:
+        out = run_sweep(snap.model, TeamState(**req.home.model_dump()), TeamState(**req.away.model_dump()),
+                        axes, n=req.n, seed=req.seed)
+        return {"model_version": snap.fingerprint, **out}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+from fastapi.responses import PlainTextResponse
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics_endpoint():
+    # Prometheus text exposition format; per-process counters (see app.metrics).
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/debug/profile/{profile_id}", response_class=PlainTextResponse)
+def debug_profile(profile_id: str):
+    from .profiling import get_profile
+    prof = get_profile(profile_id)
+    if prof is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired profile id.")
+    header = f"# {prof['label']} duration={prof['duration_s']:.4f}s samples={prof['samples']} interval={prof['interval_s']}s\n"
+    return PlainTextResponse(header + prof["collapsed"] + "\n")
@@ -0,0 +1,238 @@
+"""Deploy-time artifact bundle: precomputed data read through memory maps.
+
+    python -m app.artifact build [--out data/artifact] [--wp-n 200] [--matrix-n 1000]
+
+A bundle is a directory holding `manifest.json` plus columnar datasets
+(app.columnar):
+- teams/    the teams table's names, conferences and unit ratings
+- wp_grid/  the live win-probability grid (app.win_prob)
+- matrix/   the all-pairs matchup matrix for the whole field (app.matchups)
+
+and the model parameters in the manifest. With a bundle at ARTIFACT_PATH a
+fresh instance builds its first model snapshot from the bundled parameters and
+serves team lists, win probability and the matchup matrix from memory maps;
+only the DB check below queries the DB. The linear DriveModel is cheaper to evaluate than to
+look up, so its parameters are bundled rather than outcome tables.
+
+A bundle is not used when its format is older than FORMAT or it has been
+marked stale. The DB stays authoritative: the first lookup of bundled team
+ratings or the matrix in each process runs `verify()`, one params and one teams
+query compared with the bundle's source hash, which marks the bundle stale on
+mismatch (e.g. after /cron/calibrate or /ratings/seed ran on another instance)
+and moves the live model to the DB's params. A bundle that matched keeps
+serving whatever its age. Until then, and if the DB cannot be reached, it is
+only used while younger than ARTIFACT_MAX_AGE_HOURS (default 12, under the
+nightly calibration cadence).
+
+The first model snapshot and the win-probability grid use the bundle without
+that check (`get(verified=False)`) so DB-free routes stay DB-free; both are
+keyed on the model fingerprint, so they follow the live model once a DB-backed
+route has moved it.
+"""
+from __future__ import annotations
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, fields
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from .sim_engine import TeamState
+
+# numpy is imported inside the functions: instances without a bundle only pay
+# for checking that the manifest is missing.
+
+ARTIFACT_PATH = os.getenv("ARTIFACT_PATH", os.path.join("data", "artifact"))
+MAX_AGE_HOURS = float(os.getenv("ARTIFACT_MAX_AGE_HOURS", "12"))
+FORMAT = 1
+MANIFEST = "manifest.json"
+TEAM_FIELDS = tuple(f.name for f in fields(TeamState) if f.name != "name")
+
+def source_version(params: Dict[str, float], teams: List[Dict[str, Any]]) -> str:
+    """Hash of the DB inputs a bundle is built from (model params and team ratings)."""
+    payload = json.dumps({"params": params, "teams": teams}, sort_keys=True)
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+def db_inputs() -> tuple[Dict[str, float], List[Dict[str, Any]]]:
+    from sqlalchemy import select
+    from .db import SessionLocal
+    from .ingest import init_db
+    from .model_params import get_params
+    from .models import Team
+    init_db()
+    with SessionLocal() as sess:
+        rows = sess.execute(select(Team).order_by(Team.name.asc())).scalars().all()
+        teams = [{"name": t.name, "conference": t.conference or "",
+                  **{f: float(getattr(t, f) or 0.0) for f in TEAM_FIELDS}} for t in rows]
+    return get_params(), teams
+
+@dataclass
+class Artifact:
+    path: str
+    manifest: Dict[str, Any]
+    teams: Dict[str, Any]           # column -> memory-mapped array
+    wp_grid: Any = None             # win_prob.WPGrid
+    matrix: Any = None              # matchups.MatchupMatrix
+    stale_reason: Optional[str] = None
+    expired: Optional[str] = None   # past MAX_AGE_HOURS; only matters until the DB check matches
+    verified: Optional[str] = None  # outcome of this process's DB check, once run
+    matched: bool = False           # the DB check ran and found the bundle's source hash
+
+    @property
+    def params(self) -> Dict[str, float]:
+        return self.manifest["params"]
+
+    def team_states(self, conference: str | None = None) -> List[TeamState]:
+        import numpy as np
+        cols = self.teams
+        keep = np.ones(len(cols["name"]), dtype=bool) if not conference else cols["conference"] == conference
+        return [TeamState(name=str(cols["name"][i]), **{f: float(cols[f][i]) for f in TEAM_FIELDS})
+                for i in np.nonzero(keep)[0]]
+
+    def status(self) -> Dict[str, Any]:
+        m = self.manifest
+        return {"path": self.path, "version": m.get("version"), "built_at": m.get("built_at"),
+                "fingerprint": m.get("fingerprint"),
+                "teams": len(self.teams["name"]), "wp_grid": self.wp_grid is not None,
+                "matrix": self.matrix is not None, "stale": self.stale_reason, "expired": self.expired, "verified": self.verified}
+
+def build(out: str = ARTIFACT_PATH, wp_n: int = 200, matrix_n: int = 1000, seed: int = 0) -> Dict[str, Any]:
+    import numpy as np
+    from .columnar import move_into_place, write_columns
+    from .matchups import build_matrix, save_matrix
+    from .sim_engine import default_drive_model
+    from .win_prob import build_grid, save_grid
+    t0 = time.perf_counter()
+    params, teams = db_inputs()
+    model = default_drive_model(coef_scale=params.get("coef_scale", 1.0))
+    parent = os.path.dirname(os.path.abspath(out))
+    os.makedirs(parent, exist_ok=True)
+    tmp = tempfile.mkdtemp(prefix=".tmp-", dir=parent)
+    try:
+        write_columns(os.path.join(tmp, "teams"), {
+            "name": np.array([t["name"] for t in teams], dtype=str),
+            "conference": np.array([t["conference"] for t in teams], dtype=str),
+            **{f: np.array([t[f] for t in teams], dtype=float) for f in TEAM_FIELDS},
+        })
+        parts = ["teams"]
+        if wp_n:
+            save_grid(build_grid(model, n_per_cell=wp_n, seed=seed), os.path.join(tmp, "wp_grid"))
+            parts.append("wp_grid")
+        matrix_version = None
+        if matrix_n and len(teams) >= 2:
+            states = [TeamState(name=t["name"], **{f: t[f] for f in TEAM_FIELDS}) for t in teams]
+            m = build_matrix(model, states, n_per_bucket=matrix_n, seed=seed)
+            save_matrix(m, os.path.join(tmp, "matrix"))
+            matrix_version = m.version
+            parts.append("matrix")
+        src = source_version(params, teams)
+        manifest = {
+            "format": FORMAT,
+            "version": hashlib.sha1(f"{src}:{model.fingerprint()}:{wp_n}:{matrix_n}:{seed}".encode()).hexdigest()[:16],
+            "built_at": datetime.now(timezone.utc).isoformat(),
+            "source_version": src, "params": params, "fingerprint": model.fingerprint(),
+            "parts": parts, "matrix_version": matrix_version,
+            "build_seconds": round(time.perf_counter() - t0, 2),
+        }
+        with open(os.path.join(tmp, MANIFEST), "w") as f:
+            json.dump(manifest, f)
+        move_into_place(tmp, out, overwrite=True)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    return manifest
+
+def load(path: str = ARTIFACT_PATH) -> Optional[Artifact]:
+    """Open a bundle (columns memory-mapped); None when there is none at `path`."""
+    try:
+        with open(os.path.join(path, MANIFEST)) as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return None
+    if manifest.get("format") != FORMAT:
+        return Artifact(path, manifest, {"name": []}, stale_reason=f"format {manifest.get('format')} != {FORMAT}")
+    from .columnar import read_columns
+    from .matchups import load_matrix
+    from .win_prob import load_grid
+    _, teams = read_columns(os.path.join(path, "teams"), mmap=True)
+    art = Artifact(path, manifest, teams)
+    if "wp_grid" in manifest["parts"]:
+        art.wp_grid = load_grid(os.path.join(path, "wp_grid"))
+    if manifest.get("matrix_version"):
+        art.matrix = load_matrix(manifest["matrix_version"], root=os.path.join(path, "matrix"))
+    age_h = (datetime.now(timezone.utc) - datetime.fromisoformat(manifest["built_at"])).total_seconds() / 3600
+    if age_h > MAX_AGE_HOURS:
+        art.expired = f"built {age_h:.0f}h ago (max {MAX_AGE_HOURS:.0f}h)"
+    return art
+
+_artifact: Optional[Artifact] = None
+_loaded = False
+_verify_lock = threading.Lock()
+
+def get_any() -> Optional[Artifact]:
+    """The bundle at ARTIFACT_PATH, loaded once per process, fresh or not."""
+    global _artifact, _loaded
+    if not _loaded:
+        _artifact = load()
+        _loaded = True
+    return _artifact
+
+def get(verified: bool = True) -> Optional[Artifact]:
+    """The bundle if one is loaded, not stale, and either matched the DB or is within its age
+    limit; callers fall back to live computation on None. With `verified`, the first call per
+    process checks the bundle against the DB first."""
+    art = get_any()
+    if art is None or art.stale_reason is not None:
+        return None
+    if verified and art.verified is None:
+        with _verify_lock:
+            if art.verified is None:
+                try:
+                    verify()
+                except Exception as e:  # DB unreachable: keep serving within the age limit
+                    art.verified = f"skipped: {e.__class__.__name__}"
+                    print("[artifact] DB check skipped:", e)
+    if art.stale_reason is not None or (art.expired is not None and not art.matched):
+        return None
+    return art
+
+def mark_stale(reason: str):
+    art = get_any()
+    if art is not None and art.stale_reason is None:
+        art.stale_reason = reason
+        print("[artifact] stale:", reason)
+
+def verify() -> Optional[str]:
+    """Compare the bundle with the DB (one params and one teams query); marks it stale on mismatch."""
+    art = get_any()
+    if art is None:
+        return None
+    params, teams = db_inputs()
+    art.verified = datetime.now(timezone.utc).isoformat()
+    # The first snapshot may have come from the bundled params; move to the DB's.
+    from .snapshots import publish_coef_scale, reconcile
+    art.matched = source_version(params, teams) == art.manifest["source_version"]
+    if not art.matched:
+        mark_stale("model params or team ratings changed in the DB")
+        publish_coef_scale(params.get("coef_scale", 1.0), source="artifact_stale")
+    reconcile(params.get("coef_scale", 1.0))
+    return art.stale_reason
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Build the deploy-time artifact bundle from model_params and teams")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build")
+    b.add_argument("--out", default=ARTIFACT_PATH)
+    b.add_argument("--wp-n", type=int, default=200, help="games per win-probability grid cell (0 = skip the grid)")
+    b.add_argument("--matrix-n", type=int, default=1000, help="games per matchup bucket (0 = skip the matrix)")
+    b.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args(argv)
+    print(build(args.out, wp_n=args.wp_n, matrix_n=args.matrix_n, seed=args.seed))
+
+if __name__ == "__main__":
+    main()
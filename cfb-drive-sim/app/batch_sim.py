@@ -0,0 +1,299 @@
+"""Lockstep (vectorised) game engine.
+
+Plays many games at once: each loop iteration runs one drive for every game that
+still has clock left, so the drive model is asked for outcome probabilities once
+per drive step for all live games (`probs_batch`) instead of once per drive.
+Game rules are those of `Simulator.sim_game`, overtime included. The random
+stream differs, so results match sim_game in distribution, not draw for draw.
+
+Randomness comes from a uniform source: `uniform(key, idx)` returns one U(0,1)
+per game in `idx` (global game indices) for the draw identified by `key`
+(regulation drive step k uses key k; overtime draws use keys from OT_KEY up).
+`RandomUniforms` is plain Monte Carlo; `CommonUniforms` replays one stream
+across blocks of games (common random numbers); `AntitheticUniforms` and
+`StratifiedUniforms` are variance-reduction sources for series (app.series).
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+
+from . import metrics
+from .features import to_features_batch
+from .sim_engine import RESULTS, BaseDriveModel, DriveTrace, TeamState
+
+TEAM_FIELDS = ("off_rush", "off_pass", "def_rush", "def_pass", "st")
+OFF_RUSH, OFF_PASS, DEF_RUSH, DEF_PASS, ST = range(len(TEAM_FIELDS))
+
+TD, FG, ENDHALF = RESULTS.index("TD"), RESULTS.index("FG"), RESULTS.index("ENDHALF")
+POINTS = np.array([7 if r == "TD" else 3 if r == "FG" else 0 for r in RESULTS])
+SECONDS = np.array([{"TD": 180, "FG": 150, "PUNT": 120, "TO": 140, "DOWNS": 140}.get(r, 0) for r in RESULTS])
+
+OT_KEY = 10_000
+CHUNK = 250_000
+
+class RandomUniforms:
+    """Independent draws; plain Monte Carlo."""
+    def __init__(self, seed: int | None = None):
+        self.rng = np.random.default_rng(seed)
+
+    def start_chunk(self, lo: int, hi: int):
+        pass
+
+    def uniform(self, key: int, idx: np.ndarray) -> np.ndarray:
+        return self.rng.random(len(idx))
+
+class CommonUniforms:
+    """Common random numbers: game `idx` gets the draws of game `idx % period`.
+
+    Lay out scenarios as consecutive blocks of `period` games and every scenario
+    sees the same random stream, so differences between scenarios are not
+    swamped by sampling noise. Each key's draws come from their own seeded
+    stream, independent of the order keys are first requested in.
+    """
+    def __init__(self, period: int, seed: int | None = None):
+        self.period = period
+        self._entropy = np.random.SeedSequence(seed).entropy
+        self._draws = {}
+
+    def start_chunk(self, lo: int, hi: int):
+        pass
+
+    def uniform(self, key: int, idx: np.ndarray) -> np.ndarray:
+        u = self._draws.get(key)
+        if u is None:
+            rng = np.random.default_rng(np.random.SeedSequence(self._entropy, spawn_key=(key,)))
+            u = self._draws[key] = rng.random(self.period)
+        return u[idx % self.period]
+
+class AntitheticUniforms:
+    """Antithetic pairs: games 2i and 2i+1 use u and 1 - u for every draw.
+
+    Chunks must start at even game indices (CHUNK is even).
+    """
+    def __init__(self, seed: int | None = None):
+        self.rng = np.random.default_rng(seed)
+        self._lo = 0
+        self._draws = {}
+
+    def start_chunk(self, lo: int, hi: int):
+        self._lo, self._pairs, self._draws = lo, (hi - lo + 1) // 2, {}
+
+    def uniform(self, key: int, idx: np.ndarray) -> np.ndarray:
+        u = self._draws.get(key)
+        if u is None:
+            u = self._draws[key] = self.rng.random(self._pairs)
+        base = u[(idx - self._lo) // 2]
+        return np.where(idx % 2 == 1, 1.0 - base, base)
+
+class StratifiedUniforms:
+    """Latin hypercube over games: games are split into consecutive blocks of
+    `block`, and for each draw key the games of a block get one uniform from
+    each of `block` equal strata of (0, 1), in random order."""
+    def __init__(self, block: int, seed: int | None = None):
+        self.block = block
+        self._entropy = np.random.SeedSequence(seed).entropy
+        self._lo = self._hi = 0
+        self._draws = {}
+
+    def start_chunk(self, lo: int, hi: int):
+        self._lo, self._hi, self._draws = lo, hi, {}
+
+    def _stratum_draws(self, key: int, b: int) -> np.ndarray:
+        # Seeded by (key, block) so a block split across chunks sees one permutation.
+        rng = np.random.default_rng(np.random.SeedSequence(self._entropy, spawn_key=(key, b)))
+        return (rng.permutation(self.block) + rng.random(self.block)) / self.block
+
+    def uniform(self, key: int, idx: np.ndarray) -> np.ndarray:
+        u = self._draws.get(key)
+        if u is None:
+            b0, b1 = self._lo // self.block, (self._hi - 1) // self.block
+            full = np.concatenate([self._stratum_draws(key, b) for b in range(b0, b1 + 1)])
+            u = self._draws[key] = full[self._lo - b0 * self.block:self._hi - b0 * self.block]
+        return u[idx - self._lo]
+
+@dataclass
+class StartState:
+    """Game state to start from; each field is a scalar or one value per game.
+
+    Defaults are the opening kickoff (home ball at its own 25, full clock, 0-0).
+    """
+    seconds_left: int | np.ndarray = 3600
+    score_home: int | np.ndarray = 0
+    score_away: int | np.ndarray = 0
+    home_ball: bool | np.ndarray = True
+    yardline: int | np.ndarray = 75
+    timeouts_home: int | np.ndarray = 3
+    timeouts_away: int | np.ndarray = 3
+
+    def columns(self, n: int) -> dict:
+        return {f: np.broadcast_to(np.asarray(getattr(self, f), dtype=bool if f == "home_ball" else np.int32), (n,))
+                for f in self.__dataclass_fields__}
+
+@dataclass
+class BatchResult:
+    score_home: np.ndarray
+    score_away: np.ndarray
+    ot_periods: np.ndarray
+    drives: int
+
+    @property
+    def n(self) -> int:
+        return len(self.score_home)
+
+def team_array(team: TeamState | Sequence[TeamState] | np.ndarray, n: int) -> np.ndarray:
+    """(n, len(TEAM_FIELDS)) ratings from one TeamState, one per game, or an array."""
+    if isinstance(team, TeamState):
+        row = np.array([getattr(team, f) or 0.0 for f in TEAM_FIELDS], dtype=float)
+        return np.broadcast_to(row, (n, len(TEAM_FIELDS)))
+    if isinstance(team, np.ndarray):
+        return np.broadcast_to(team, (n, len(TEAM_FIELDS)))
+    return np.array([[getattr(t, f) or 0.0 for f in TEAM_FIELDS] for t in team], dtype=float)
+
+def _sample(P: np.ndarray, u: np.ndarray) -> np.ndarray:
+    # Same rule as DriveModel.sample: first outcome whose cumulative probability reaches u.
+    return (np.cumsum(P[:, :-1], axis=1) < u[:, None]).sum(axis=1)
+
+def _ot_probs(model: BaseDriveModel, off: np.ndarray, de: np.ndarray) -> np.ndarray:
+    # An OT possession starts at the 25 with no clock, tied, one timeout each; it cannot end the half.
+    X = to_features_batch(25, 0, 0, off[:, OFF_RUSH], off[:, OFF_PASS], de[:, DEF_RUSH], de[:, DEF_PASS],
+                          (off[:, ST] + de[:, ST]) / 2, 1, 1)
+    P = np.array(model.probs_batch(X), dtype=float)
+    P[:, ENDHALF] = 0.0
+    return P / P.sum(axis=1, keepdims=True)
+
+def _two_point_p(off: np.ndarray, de: np.ndarray) -> np.ndarray:
+    diff = (off[:, OFF_RUSH] + off[:, OFF_PASS]) - (de[:, DEF_RUSH] + de[:, DEF_PASS])
+    return np.clip(0.45 + 0.0015 * diff, 0.30, 0.70)
+
+def _overtime(model, H, A, sh, sa, ot, tied, lo, src, parts):
+    Ht, At = H[tied], A[tied]
+    P = (_ot_probs(model, Ht, At), _ot_probs(model, At, Ht))           # [0]=home offense, [1]=away
+    xp = (np.clip(0.98 + 0.0005 * Ht[:, ST], 0.90, 0.999), np.clip(0.98 + 0.0005 * At[:, ST], 0.90, 0.999))
+    two = (_two_point_p(Ht, At), _two_point_p(At, Ht))
+    scores = (sh, sa)
+    active = np.arange(tied.size)
+    first = 0  # side that has the ball first this period
+    for period in (1, 2):
+        ot[tied[active]] += 1
+        for j, side in enumerate((first, 1 - first)):
+            g = tied[active]
+            key = OT_KEY + 10 * period + 2 * j
+            res = _sample(P[side][active], src.uniform(key, g + lo))
+            conv_u = src.uniform(key + 1, g + lo)
+            if period == 1:
+                conv = (conv_u < xp[side][active]) * 1
+            else:
+                conv = (conv_u < two[side][active]) * 2
+            pts = np.where(res == TD, 6 + conv, np.where(res == FG, 3, 0))
+            scores[side][g] += pts
+            if parts is not None:
+                parts.append((g + lo, np.full(g.size, side), np.full(g.size, 25), res, pts, np.zeros(g.size)))
+        active = active[sh[tied[active]] == sa[tied[active]]]
+        if not active.size:
+            return
+        first = 1 - first
+    # From the third period on: alternating 2-pt tries until one side converts and the other does not.
+    ot[tied[active]] += 1
+    period = 3
+    while active.size:
+        g = tied[active]
+        key = OT_KEY + 10 * period
+        h = src.uniform(key, g + lo) < two[0][active]
+        a = src.uniform(key + 1, g + lo) < two[1][active]
+        decided = h != a
+        sh[g[decided & h]] += 2
+        sa[g[decided & a]] += 2
+        still = ~decided
+        ot[g[still]] += 1
+        capped = still & (ot[g] > 20)
+        if capped.any():
+            gc = g[capped]
+            coin = src.uniform(key + 2, gc + lo) < 0.5
+            sh[gc[coin]] += 2
+            sa[gc[~coin]] += 2
+        active = active[still & ~capped]
+        period += 1
+
+def _simulate_chunk(model, H, A, lo, hi, start, src, parts, control=None):
+    m = hi - lo
+    sh = start["score_home"][lo:hi].copy()
+    sa = start["score_away"][lo:hi].copy()
+    secs = start["seconds_left"][lo:hi].copy()
+    home_ball = start["home_ball"][lo:hi].copy()
+    yardline = start["yardline"][lo:hi].copy()
+    timeouts = np.column_stack([start["timeouts_home"][lo:hi], start["timeouts_away"][lo:hi]])  # [home, away]
+    ot = np.zeros(m, dtype=np.int32)
+    live = np.nonzero(secs > 0)[0]
+    drives = 0
+    step = 0
+    while live.size:
+        hb = home_ball[live]
+        Hl, Al = H[live], A[live]
+        off = np.where(hb[:, None], Hl, Al)
+        de = np.where(hb[:, None], Al, Hl)
+        sign = np.where(hb, 1, -1)
+        X = to_features_batch(yardline[live], secs[live], (sh[live] - sa[live]) * sign,
+                              off[:, OFF_RUSH], off[:, OFF_PASS], de[:, DEF_RUSH], de[:, DEF_PASS],
+                              (Hl[:, ST] + Al[:, ST]) / 2,
+                              np.where(hb, timeouts[live, 0], timeouts[live, 1]),
+                              np.where(hb, timeouts[live, 1], timeouts[live, 0]))
+        P = np.asarray(model.probs_batch(X))
+        res = _sample(P, src.uniform(step, live + lo))
+        pts = POINTS[res]
+        if control is not None:
+            control[live + lo, (~hb).astype(np.int8)] += pts - P @ POINTS
+        before = secs[live]
+        after = np.where(res == ENDHALF, 0, before - SECONDS[res])
+        sh[live] += pts * hb
+        sa[live] += pts * ~hb
+        secs[live] = after
+        if parts is not None:
+            parts.append((live + lo, (~hb).astype(np.int8), yardline[live], res, pts, before - np.maximum(after, 0)))
+        home_ball[live] = ~hb
+        yardline[live] = 75
+        drives += live.size
+        live = live[after > 0]
+        step += 1
+    tied = np.nonzero(sh == sa)[0]
+    if tied.size:
+        _overtime(model, H, A, sh, sa, ot, tied, lo, src, parts)
+    return sh, sa, ot, drives
+
+def simulate(model: BaseDriveModel, home, away, n: int, seed: int | None = None,
+             uniforms=None, trace: DriveTrace | None = None, start: StartState | None = None,
+             chunk: int = CHUNK, control: np.ndarray | None = None) -> BatchResult:
+    """Simulate `n` games between `home` and `away` (TeamStates, per-game lists or rating arrays),
+    from the kickoff or from `start`.
+
+    `control`, an (n, 2) float array, receives per game and side [home, away] the
+    sum over regulation drives of points scored minus the model's expected points
+    for the drive: a zero-mean control variate.
+    """
+    src = uniforms if uniforms is not None else RandomUniforms(seed)
+    start = (start if start is not None else StartState()).columns(n)
+    H = team_array(home, n)
+    A = team_array(away, n)
+    score_home = np.empty(n, dtype=np.int32)
+    score_away = np.empty(n, dtype=np.int32)
+    ot_periods = np.empty(n, dtype=np.int32)
+    parts = [] if trace is not None else None
+    drives = 0
+    for lo in range(0, n, chunk):
+        hi = min(n, lo + chunk)
+        src.start_chunk(lo, hi)
+        sh, sa, ot, d = _simulate_chunk(model, H[lo:hi], A[lo:hi], lo, hi, start, src, parts, control)
+        score_home[lo:hi], score_away[lo:hi], ot_periods[lo:hi] = sh, sa, ot
+        drives += d
+    ot_drives = 2 * np.minimum(ot_periods, 2).sum()
+    if trace is not None and parts:
+        cols = [np.concatenate(c) for c in zip(*parts)]
+        order = np.argsort(cols[0], kind="stable")
+        cols[0] = cols[0] + trace.games
+        trace.extend(*(c[order] for c in cols))
+    if trace is not None:
+        trace.games += n
+    if metrics.ENABLED:
+        metrics.record_games(n, int(drives + ot_drives), int((ot_periods > 0).sum()))
+    return BatchResult(score_home, score_away, ot_periods, int(drives + ot_drives))
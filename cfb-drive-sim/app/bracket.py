@@ -0,0 +1,89 @@
+"""Single-elimination bracket simulator, all brackets advanced together as arrays.
+
+Teams are given in seed order. The field is padded to the next power of two
+with byes in the standard seeding layout (1 v 16, 8 v 9, 4 v 13, ...), so the top
+seeds take the byes; a 12-team field gives the CFP format: seeds 5-12 play the
+first round and 1-4 meet those winners in the quarterfinals. No reseeding.
+
+Game results come from a pairwise home win matrix (app.matchups). In the first
+`home_rounds` rounds the better seed hosts; later games are neutral, scored as
+the average of both teams' home and away probabilities.
+"""
+from __future__ import annotations
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+import numpy as np
+
+BYE = -1
+CHUNK = 1_000_000
+
+def bracket_order(size: int) -> List[int]:
+    """Seed indices (0-based) in bracket slot order for a power-of-two field."""
+    order = [0]
+    while len(order) < size:
+        m = 2 * len(order)
+        order = [s for seed in order for s in (seed, m - 1 - seed)]
+    return order
+
+def first_round(n_teams: int) -> np.ndarray:
+    """Slot -> team index (seed order) for the opening round; BYE where a top seed has no opponent."""
+    size = 1
+    while size < n_teams:
+        size *= 2
+    return np.array([s if s < n_teams else BYE for s in bracket_order(size)], dtype=np.int16)
+
+def game_probs(home_win: np.ndarray, hosted: bool) -> np.ndarray:
+    """(t, t) P(row team beats column team), row team being the better seed."""
+    if hosted:
+        return home_win
+    return (home_win + 1.0 - home_win.T) / 2
+
+@dataclass
+class BracketResult:
+    reach: np.ndarray       # (teams, rounds + 1): P(alive at the start of round r); last column = title
+    brackets: int
+    seconds: float
+
+def simulate_brackets(home_win: np.ndarray, n: int, home_rounds: int = 1, seed: int | None = None,
+                      chunk: int = CHUNK) -> BracketResult:
+    t0 = time.perf_counter()
+    t = home_win.shape[0]
+    slots0 = first_round(t)
+    rounds = int(np.log2(len(slots0)))
+    # Pad with a never-used row/column so BYE (-1) indexes safely; byes never win.
+    P = [np.pad(np.nan_to_num(game_probs(home_win, r < home_rounds), nan=0.5), (0, 1)) for r in range(rounds)]
+    counts = np.zeros((t, rounds + 1), dtype=np.int64)
+    rng = np.random.default_rng(seed)
+    for lo in range(0, n, chunk):
+        m = min(chunk, n - lo)
+        slots = np.broadcast_to(slots0, (m, len(slots0)))
+        for r in range(rounds):
+            alive = slots[slots != BYE]
+            counts[:, r] += np.bincount(alive, minlength=t)
+            a, b = slots[:, 0::2], slots[:, 1::2]
+            # lower seed index = better seed; it hosts when the round is hosted
+            hi, lo_seed = np.minimum(a, b), np.maximum(a, b)
+            bye = (a == BYE) | (b == BYE)
+            hi = np.where(bye, np.maximum(a, b), hi)
+            p = P[r][hi, lo_seed]
+            win = rng.random(hi.shape) < p
+            slots = np.where(bye | win, hi, lo_seed).astype(np.int16)
+        counts[:, rounds] += np.bincount(slots[:, 0], minlength=t)
+    return BracketResult(counts / n, n, time.perf_counter() - t0)
+
+def round_names(rounds: int) -> List[str]:
+    named = ["final", "semifinal", "quarterfinal"]
+    labels = [named[rounds - 1 - r] if rounds - 1 - r < len(named) else f"round_{r + 1}" for r in range(rounds)]
+    return labels + ["champion"]
+
+def summarize(names: List[str], res: BracketResult) -> Dict[str, Any]:
+    labels = round_names(res.reach.shape[1] - 1)
+    return {
+        "brackets": res.brackets,
+        "rounds": labels,
+        "teams": [{"seed": i + 1, "name": name, **{lab: float(p) for lab, p in zip(labels, row)}}
+                  for i, (name, row) in enumerate(zip(names, res.reach))],
+        "seconds": round(res.seconds, 3),
+    }
@@ -39,10 +39,10 @@ def sample_random_matchups(k: int) -> list[tuple[TeamState, TeamState]]:
 def calibrate_coef_scale(target_ppg: float, season_for_matchups: int, samples: int = 2000, seed: int | None = None) -> float:
     # We tune a scalar 'coef_scale' that multiplies the drive model's coefficients inside Simulator.
     rng = random.Random(seed)
-    sim = Simulator()
+    base = Simulator()
     # Helper: evaluate PPG given coef_scale
     def eval_scale(scale: float, trials: int = 300) -> float:
-        sim.set_coef_scale(scale)
+        sim = base.with_coef_scale(scale)
         # couple hundred random matchups
         m = sample_random_matchups(min(trials, samples))
         if not m:
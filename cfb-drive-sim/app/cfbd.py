@@ -1,6 +1,8 @@
 import os
+import time
 import httpx
 from typing import Any, Dict, Optional
+from . import metrics
 
 BASE = "https://api.collegefootballdata.com"
 API_KEY = os.getenv("CFBD_API_KEY")
@@ -15,6 +17,13 @@ async def get(path: str, params: Optional[Dict[str, Any]] = None):
     if not API_KEY:
         raise RuntimeError("CFBD_API_KEY is not set in environment.")
     async with httpx.AsyncClient(timeout=30) as client:
-        r = await client.get(f"{BASE}{path}", params=params or {}, headers=_headers())
+        t0 = time.perf_counter()
+        status = "error"
+        try:
+            r = await client.get(f"{BASE}{path}", params=params or {}, headers=_headers())
+            status = r.status_code
+        finally:
+            if metrics.ENABLED:
+                metrics.CFBD_LATENCY.observe(time.perf_counter() - t0, path=path, status=status)
         r.raise_for_status()
         return r.json()
@@ -0,0 +1,72 @@
+"""Column-per-file storage for large result arrays.
+
+A dataset is a directory holding one `.npy` file per column plus `meta.json`.
+Plain `.npy` (rather than `.npz`) keeps every column memory-mappable, so readers
+can slice a range out of a large dataset without loading it.
+"""
+from __future__ import annotations
+import json
+import os
+import shutil
+import tempfile
+from array import array
+from typing import Any, Dict, Tuple
+
+import numpy as np
+
+META_FILE = "meta.json"
+
+def _as_ndarray(col) -> np.ndarray:
+    if isinstance(col, array):
+        return np.frombuffer(col, dtype=col.typecode)
+    return np.asarray(col)
+
+def move_into_place(tmp: str, path: str, overwrite: bool = False):
+    """Rename the finished directory `tmp` to `path` (a sibling). With `overwrite`
+    an existing directory at `path` is swapped out first and then removed."""
+    if overwrite and os.path.exists(path):
+        old = tempfile.mkdtemp(prefix=".old-", dir=os.path.dirname(os.path.abspath(path)))
+        os.rename(path, os.path.join(old, "data"))
+        os.rename(tmp, path)
+        shutil.rmtree(old, ignore_errors=True)
+    else:
+        os.rename(tmp, path)
+
+def write_columns(path: str, columns: Dict[str, Any], meta: Dict[str, Any] | None = None,
+                  overwrite: bool = False) -> Dict[str, Any]:
+    """Write `columns` under `path` and return the stored metadata.
+
+    Files are written to a temporary sibling directory that is then renamed into
+    place, so readers never observe a half-written dataset. With `overwrite` an
+    existing dataset at `path` is swapped out and removed.
+    """
+    parent = os.path.dirname(os.path.abspath(path))
+    os.makedirs(parent, exist_ok=True)
+    tmp = tempfile.mkdtemp(prefix=".tmp-", dir=parent)
+    try:
+        info = {}
+        for name, col in columns.items():
+            arr = _as_ndarray(col)
+            np.save(os.path.join(tmp, f"{name}.npy"), arr, allow_pickle=False)
+            info[name] = {"dtype": arr.dtype.str, "shape": list(arr.shape)}
+        stored = dict(meta or {})
+        stored["columns"] = info
+        with open(os.path.join(tmp, META_FILE), "w") as f:
+            json.dump(stored, f)
+        move_into_place(tmp, path, overwrite)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    return stored
+
+def read_meta(path: str) -> Dict[str, Any]:
+    with open(os.path.join(path, META_FILE)) as f:
+        return json.load(f)
+
+def read_columns(path: str, mmap: bool = True) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+    """Return (meta, columns); with `mmap` the columns are read-only memory maps."""
+    meta = read_meta(path)
+    mode = "r" if mmap else None
+    cols = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mode, allow_pickle=False)
+            for name in meta["columns"]}
+    return meta, cols
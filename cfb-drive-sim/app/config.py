@@ -0,0 +1,16 @@
+"""Small environment helpers shared by the API and the instrumentation modules."""
+import os
+
+def env_true(name: str, default: bool = False) -> bool:
+    v = os.getenv(name)
+    if v is None: return default
+    return v.lower() in ("1", "true", "yes", "on")
+
+def data_dir(env: str, name: str) -> str:
+    """Where a kind of on-disk data lives: $`env` if set, else data/<name>, or under /tmp
+    on Vercel, whose deployment filesystem is read-only (and /tmp per instance)."""
+    path = os.getenv(env)
+    if path:
+        return path
+    root = os.path.join("/tmp", "cfb-drive-sim") if os.getenv("VERCEL") else "data"
+    return os.path.join(root, name)
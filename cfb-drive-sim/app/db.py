@@ -1,9 +1,13 @@
 import os
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from . import metrics
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///data/cfb.sqlite3")
 connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
 engine = create_engine(DATABASE_URL, connect_args=connect_args)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 Base = declarative_base()
+
+if metrics.ENABLED:
+    metrics.instrument_engine(engine)
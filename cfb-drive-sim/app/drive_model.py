@@ -0,0 +1,126 @@
+"""Trained drive outcome model: fit from the `drives` table, load from an artifact.
+
+The artifact is a pickle holding the fitted classifier and the outcome label of
+each of its `predict_proba` columns. Fitting needs the ML extras
+(requirements-ml.txt); loading only needs whatever the classifier itself needs.
+
+    python -m app.drive_model --out data/drive_model.pkl --kind logreg [--season 2024]
+    DRIVE_MODEL_PATH=data/drive_model.pkl uvicorn index:app
+
+Features are those of the simulator (features.to_features) with each team's
+current unit ratings. Drives do not record timeouts, so those features are set
+to the simulator's default of 3 each.
+"""
+from __future__ import annotations
+import argparse
+import pickle
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from .features import DriveContext, to_features
+from .sim_engine import RESULTS, RESULT_CODE, BaseDriveModel
+
+KINDS = ("logreg", "gbm", "xgboost")
+
+class TrainedDriveModel(BaseDriveModel):
+    batched = True
+
+    def __init__(self, classifier, classes, meta: Optional[Dict[str, Any]] = None):
+        self.classifier = classifier
+        self.classes = list(classes)
+        self.meta = dict(meta or {})
+        self._cols = np.array([RESULT_CODE[c] for c in self.classes])
+
+    @classmethod
+    def load(cls, path: str) -> "TrainedDriveModel":
+        with open(path, "rb") as f:
+            art = pickle.load(f)
+        return cls(art["classifier"], art["classes"], art.get("meta"))
+
+    def save(self, path: str):
+        with open(path, "wb") as f:
+            pickle.dump({"classifier": self.classifier, "classes": self.classes, "meta": self.meta}, f)
+
+    def fingerprint(self) -> str:
+        return f"trained:{self.meta.get('kind')}:{self.meta.get('trained_at')}"
+
+    def probs_batch(self, X):
+        raw = self.classifier.predict_proba(np.asarray(X, dtype=float))
+        P = np.zeros((raw.shape[0], len(RESULTS)))
+        P[:, self._cols] = raw
+        # Same floor as the linear model so no outcome is ever impossible.
+        P = np.maximum(P, 0.001)
+        return P / P.sum(axis=1, keepdims=True)
+
+def load_training_data(season: Optional[int] = None):
+    """(X, y) from ingested drives, y holding RESULTS indices."""
+    from sqlalchemy import select
+    from sqlalchemy.orm import aliased
+    from .db import SessionLocal
+    from .models import Drive, Game, Team
+    Off, Def = aliased(Team), aliased(Team)
+    stmt = (select(Drive, Off, Def)
+            .join(Off, Drive.offense_id == Off.team_id)
+            .join(Def, Drive.defense_id == Def.team_id))
+    if season is not None:
+        stmt = stmt.join(Game, Drive.game_id == Game.game_id).where(Game.season == season)
+    X, y = [], []
+    with SessionLocal() as sess:
+        for d, o, de in sess.execute(stmt).all():
+            if d.result not in RESULT_CODE or d.start_yardline is None:
+                continue
+            ctx = DriveContext(
+                yardline=d.start_yardline,
+                seconds_left=d.start_seconds_left or 0,
+                score_diff=d.start_score_diff or 0,
+                off_rush=o.off_rush or 0, off_pass=o.off_pass or 0,
+                def_rush=de.def_rush or 0, def_pass=de.def_pass or 0,
+                st=((o.st or 0) + (de.st or 0))/2,
+                timeouts_off=3, timeouts_def=3,
+            )
+            X.append(to_features(ctx))
+            y.append(RESULT_CODE[d.result])
+    return np.asarray(X, dtype=float), np.asarray(y, dtype=int)
+
+def make_classifier(kind: str):
+    if kind == "logreg":
+        from sklearn.linear_model import LogisticRegression
+        return LogisticRegression(max_iter=1000)
+    if kind == "gbm":
+        from sklearn.ensemble import HistGradientBoostingClassifier
+        return HistGradientBoostingClassifier(max_iter=200, learning_rate=0.05)
+    if kind == "xgboost":
+        from xgboost import XGBClassifier
+        return XGBClassifier(n_estimators=300, max_depth=4, learning_rate=0.05, objective="multi:softprob")
+    raise ValueError(f"unknown model kind {kind!r}; expected one of {KINDS}")
+
+def fit(X: np.ndarray, y: np.ndarray, kind: str = "logreg", meta: Optional[Dict[str, Any]] = None) -> TrainedDriveModel:
+    present = np.unique(y)
+    clf = make_classifier(kind)
+    # xgboost wants labels 0..k-1; sklearn keeps whatever labels it is given.
+    remap = np.searchsorted(present, y)
+    clf.fit(X, remap)
+    classes = [RESULTS[present[int(c)]] for c in getattr(clf, "classes_", range(len(present)))]
+    meta = dict(meta or {}, kind=kind, n_drives=int(len(y)), trained_at=datetime.utcnow().isoformat())
+    return TrainedDriveModel(clf, classes, meta)
+
+def train(out_path: str, kind: str = "logreg", season: Optional[int] = None) -> Dict[str, Any]:
+    X, y = load_training_data(season)
+    if len(y) == 0:
+        return {"ok": False, "error": "No ingested drives. Run fetch_and_store_drives first."}
+    model = fit(X, y, kind=kind, meta={"season": season})
+    model.save(out_path)
+    return {"ok": True, "path": out_path, **model.meta, "classes": model.classes}
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Fit a drive outcome classifier from the drives table")
+    ap.add_argument("--out", default="data/drive_model.pkl")
+    ap.add_argument("--kind", choices=KINDS, default="logreg")
+    ap.add_argument("--season", type=int, default=None)
+    args = ap.parse_args(argv)
+    print(train(args.out, kind=args.kind, season=args.season))
+
+if __name__ == "__main__":
+    main()
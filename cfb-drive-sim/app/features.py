@@ -24,3 +24,20 @@ def to_features(ctx: DriveContext):
         ctx.timeouts_off/3.0,
         ctx.timeouts_def/3.0,
     ]
+
+def to_features_batch(yardline, seconds_left, score_diff, off_rush, off_pass, def_rush, def_pass,
+                      st, timeouts_off, timeouts_def):
+    """Vectorised to_features: equal-length arrays (or scalars) in, an (n, 8) array out."""
+    import numpy as np
+    cols = [
+        np.asarray(yardline)/100.0,
+        np.asarray(seconds_left)/3600.0,
+        np.clip(score_diff, -50, 50)/50.0,
+        (np.asarray(off_rush) - def_rush)/200.0,
+        (np.asarray(off_pass) - def_pass)/200.0,
+        np.asarray(st)/100.0,
+        np.asarray(timeouts_off)/3.0,
+        np.asarray(timeouts_def)/3.0,
+    ]
+    n = max(np.size(c) for c in cols)
+    return np.column_stack([np.broadcast_to(c, (n,)) for c in cols])
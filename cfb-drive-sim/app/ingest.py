@@ -1,15 +1,44 @@
 from __future__ import annotations
 import asyncio
+from collections import Counter
 from typing import List, Dict, Any, Optional
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 from .db import SessionLocal, engine, Base
-from .models import Team, Game
+from .models import Team, Game, Drive
 from .cfbd import get as cfbd_get
 
+# Columns added to tables that already existed in the first schema. create_all never
+# alters an existing table, so init_db adds any that are missing (see sql/schema.sql).
+ADDED_COLUMNS = {
+    "games": [("cfbd_id", "INTEGER")],
+    "drives": [("cfbd_id", "TEXT"), ("start_seconds_left", "INTEGER"), ("start_score_diff", "INTEGER")],
+}
+ADDED_UNIQUE = {("games", "cfbd_id"): "ux_games_cfbd_id", ("drives", "cfbd_id"): "ux_drives_cfbd_id"}
+_migrated = False
+
+def _add_missing_columns():
+    from sqlalchemy import inspect, text
+    insp = inspect(engine)
+    with engine.begin() as conn:
+        for table, cols in ADDED_COLUMNS.items():
+            have = {c["name"] for c in insp.get_columns(table)}
+            for name, type_ in cols:
+                if name in have:
+                    continue
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {type_}"))
+                index = ADDED_UNIQUE.get((table, name))
+                if index:
+                    conn.execute(text(f"CREATE UNIQUE INDEX IF NOT EXISTS {index} ON {table} ({name})"))
+                print(f"[db] added {table}.{name}")
+
 def init_db():
-    # Create tables if not exist
+    # Create tables if not exist, then bring older tables up to the current columns (once per process).
+    global _migrated
     Base.metadata.create_all(bind=engine)
+    if not _migrated:
+        _add_missing_columns()
+        _migrated = True
 
 def upsert_team(sess: Session, name: str, conference: Optional[str] = None) -> Team:
     t = sess.execute(select(Team).where(Team.name == name)).scalar_one_or_none()
@@ -62,6 +91,7 @@ async def fetch_and_store_games(season: int, team: Optional[str] = None, week: O
             neutral = 1 if g.get("neutral_site") else 0
 
             # See if exists:
+            cfbd_id = g.get("id")
             exists = sess.execute(
                 select(Game).where(
                     Game.season == season_v,
@@ -73,6 +103,8 @@ async def fetch_and_store_games(season: int, team: Optional[str] = None, week: O
             if exists:
                 # update scores if now known
                 changed = False
+                if cfbd_id is not None and exists.cfbd_id != cfbd_id:
+                    exists.cfbd_id = cfbd_id; changed = True
                 if home_pts is not None and exists.home_pts != home_pts:
                     exists.home_pts = home_pts; changed = True
                 if away_pts is not None and exists.away_pts != away_pts:
@@ -84,10 +116,92 @@ async def fetch_and_store_games(season: int, team: Optional[str] = None, week: O
                 if changed:
                     sess.add(exists)
             else:
-                game = Game(season=season_v, week=week_v, date=str(date_v) if date_v else None,
+                game = Game(cfbd_id=cfbd_id, season=season_v, week=week_v, date=str(date_v) if date_v else None,
                             neutral=neutral, home_id=home.team_id, away_id=away.team_id,
                             home_pts=home_pts, away_pts=away_pts)
                 sess.add(game)
             count += 1
         sess.commit()
     return count
+
+# CFBD drive_result -> sim_engine.RESULTS. Missed/blocked kicks and safeties give the
+# ball away without points, which the drive model treats like a turnover on downs.
+DRIVE_RESULT_MAP = {
+    "TD": "TD", "PASSING TD": "TD", "RUSHING TD": "TD",
+    "FG": "FG", "FG GOOD": "FG",
+    "PUNT": "PUNT", "BLOCKED PUNT": "PUNT", "PUNT TD": "PUNT", "PUNT RETURN TD": "PUNT",
+    "BLOCKED PUNT TD": "PUNT",
+    "INT": "TO", "FUMBLE": "TO", "INT TD": "TO", "FUMBLE TD": "TO", "FUMBLE RETURN TD": "TO",
+    "DOWNS": "DOWNS", "MISSED FG": "DOWNS", "BLOCKED FG": "DOWNS", "MISSED FG TD": "DOWNS",
+    "BLOCKED FG TD": "DOWNS", "SF": "DOWNS", "SAFETY": "DOWNS",
+    "END OF HALF": "ENDHALF", "END OF GAME": "ENDHALF", "END OF 4TH QUARTER": "ENDHALF",
+}
+
+def _clock_seconds(t: Optional[Dict[str, Any]]) -> int:
+    t = t or {}
+    return int(t.get("minutes") or 0) * 60 + int(t.get("seconds") or 0)
+
+async def fetch_and_store_drives(season: int, team: Optional[str] = None, week: Optional[int] = None) -> int:
+    """Upsert CFBD drives for a season into `drives`; run after fetch_and_store_games.
+
+    Drives are matched to games on the CFBD game id (stored by fetch_and_store_games),
+    or on home/away teams when that pairing is unique in the season; rematches of
+    games stored without a CFBD id are ambiguous and skipped. Drives whose game is not
+    in the DB, that start in overtime, or whose result has no drive-model equivalent
+    are skipped too; unmapped results are counted and printed so gaps in
+    DRIVE_RESULT_MAP show up in the logs.
+    """
+    init_db()
+    params = {"year": season}
+    if week is not None:
+        params["week"] = week
+    if team:
+        params["team"] = team
+    data = await cfbd_get("/drives", params=params)
+    count = 0
+    with SessionLocal() as sess:
+        teams = {t.name: t for t in sess.execute(select(Team)).scalars().all()}
+        by_cfbd, by_pair = {}, {}
+        for g in sess.execute(select(Game).where(Game.season == season)).scalars().all():
+            if g.cfbd_id is not None:
+                by_cfbd[g.cfbd_id] = g
+            by_pair.setdefault((g.home_id, g.away_id), []).append(g)
+        ids = [str(d.get("id")) for d in data if d.get("id") is not None]
+        existing = set()
+        for i in range(0, len(ids), 500):
+            existing.update(sess.execute(select(Drive.cfbd_id).where(Drive.cfbd_id.in_(ids[i:i+500]))).scalars())
+        unmapped = Counter()
+        for d in data:
+            raw = (d.get("drive_result") or "").upper()
+            result = DRIVE_RESULT_MAP.get(raw)
+            period = d.get("start_period") or 0
+            if result is None and 1 <= period <= 4:
+                unmapped[raw] += 1
+            if result is None or not 1 <= period <= 4 or str(d.get("id")) in existing:
+                continue
+            off = teams.get(d.get("offense"))
+            de = teams.get(d.get("defense"))
+            if not off or not de:
+                continue
+            home, away = (off, de) if d.get("is_home_offense") else (de, off)
+            game = by_cfbd.get(d.get("game_id"))
+            if game is None:
+                pair = by_pair.get((home.team_id, away.team_id), [])
+                game = pair[0] if len(pair) == 1 else None
+            if not game:
+                continue
+            start_score = (d.get("start_offense_score") or 0) - (d.get("start_defense_score") or 0)
+            points = (d.get("end_offense_score") or 0) - (d.get("start_offense_score") or 0)
+            sess.add(Drive(
+                cfbd_id=str(d.get("id")), game_id=game.game_id,
+                offense_id=off.team_id, defense_id=de.team_id,
+                start_yardline=d.get("start_yards_to_goal"),
+                start_seconds_left=(4 - period) * 900 + _clock_seconds(d.get("start_time")),
+                start_score_diff=start_score, result=result, points=max(0, points),
+                seconds=_clock_seconds(d.get("elapsed")),
+            ))
+            count += 1
+        sess.commit()
+    if unmapped:
+        print(f"[ingest] skipped {sum(unmapped.values())} drives with unmapped results:", dict(unmapped.most_common()))
+    return count
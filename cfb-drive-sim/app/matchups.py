@@ -0,0 +1,191 @@
+"""All-pairs matchup matrix: home win probability for every ordered pair of teams.
+
+Team ratings reach the drive model only as rating differences
+(features.to_features): the home offense's rush and pass edges over the away
+defense, the away offense's edges over the home defense, and the average
+special-teams rating. Every directed pair is reduced to those five numbers,
+rounded to `bucket` rating points, and each distinct bucket is simulated once
+(with the batch engine, many buckets per call) and shared by all pairs that
+fall in it. All buckets see the same random draws (common random numbers), so
+the matrix is smooth in the ratings rather than noisy from bucket to bucket.
+
+Bucket teams carry each edge on their offense with zero defense, which
+reproduces the regulation features exactly; only the overtime extra-point
+rate, which uses each side's own special-teams rating, is approximated by the
+average.
+
+Matrices are cached in memory and under MATRIX_DIR (and may ship prebuilt in
+the artifact bundle, app.artifact), keyed by a version hash of
+the model fingerprint, the team ratings and the build settings, so any change
+to either produces a new matrix instead of a stale one.
+"""
+from __future__ import annotations
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .batch_sim import CHUNK, OFF_PASS, OFF_RUSH, DEF_PASS, DEF_RUSH, ST, CommonUniforms, simulate, team_array
+from .config import data_dir
+from .sim_engine import BaseDriveModel, TeamState
+
+MATRIX_DIR = data_dir("MATRIX_DIR", "matrix")
+BUCKET = 10.0
+MAX_CACHED = 4
+
+@dataclass
+class MatchupMatrix:
+    version: str
+    names: List[str]
+    home_win: np.ndarray    # (t, t): P(row team beats column team, row at home); diagonal NaN
+    meta: Dict[str, Any]
+
+    def index(self, name: str) -> int:
+        return self.names.index(name)
+
+def pair_edges(R: np.ndarray) -> np.ndarray:
+    """(t, t, 5) rating edges of every directed pair: home rush/pass, away rush/pass, mean st."""
+    H, A = R[:, None, :], R[None, :, :]
+    return np.stack([
+        H[..., OFF_RUSH] - A[..., DEF_RUSH],
+        H[..., OFF_PASS] - A[..., DEF_PASS],
+        A[..., OFF_RUSH] - H[..., DEF_RUSH],
+        A[..., OFF_PASS] - H[..., DEF_PASS],
+        (H[..., ST] + A[..., ST]) / 2,
+    ], axis=-1)
+
+def version(model: BaseDriveModel, teams: Sequence[TeamState], n_per_bucket: int, bucket: float,
+            seed: int | None) -> str:
+    R = team_array(list(teams), len(teams))
+    payload = json.dumps({
+        "model": model.fingerprint(), "n": n_per_bucket, "bucket": bucket, "seed": seed,
+        "teams": [[t.name, *map(float, row)] for t, row in zip(teams, R)],
+    })
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+def build_matrix(model: BaseDriveModel, teams: Sequence[TeamState], n_per_bucket: int = 1000,
+                 bucket: float = BUCKET, seed: int | None = 0) -> MatchupMatrix:
+    t0 = time.perf_counter()
+    t = len(teams)
+    R = team_array(list(teams), t)
+    keys = np.rint(pair_edges(R).reshape(t * t, 5) / bucket).astype(np.int64)
+    off_diag = ~np.eye(t, dtype=bool).ravel()
+    uniq, inverse = np.unique(keys[off_diag], axis=0, return_inverse=True)
+    centers = uniq * bucket
+    zero = np.zeros(len(centers))
+    H = np.column_stack([centers[:, 0], centers[:, 1], zero, zero, centers[:, 4]])
+    A = np.column_stack([centers[:, 2], centers[:, 3], zero, zero, centers[:, 4]])
+
+    src = CommonUniforms(n_per_bucket, seed)
+    wins = np.empty(len(centers))
+    per_call = max(1, CHUNK // n_per_bucket)
+    for lo in range(0, len(centers), per_call):
+        hi = min(len(centers), lo + per_call)
+        out = simulate(model, np.repeat(H[lo:hi], n_per_bucket, axis=0), np.repeat(A[lo:hi], n_per_bucket, axis=0),
+                       (hi - lo) * n_per_bucket, uniforms=src)
+        wins[lo:hi] = (out.score_home > out.score_away).reshape(hi - lo, n_per_bucket).mean(axis=1)
+
+    home_win = np.full(t * t, np.nan)
+    home_win[off_diag] = wins[inverse.ravel()]
+    meta = {
+        "model": model.fingerprint(), "teams": t, "pairs": int(off_diag.sum()), "buckets": len(centers),
+        "bucket": bucket, "n_per_bucket": n_per_bucket, "seed": seed,
+        "games_simulated": len(centers) * n_per_bucket,
+        "build_seconds": round(time.perf_counter() - t0, 3),
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+    ver = version(model, teams, n_per_bucket, bucket, seed)
+    return MatchupMatrix(ver, [tm.name for tm in teams], home_win.reshape(t, t), meta)
+
+def save_matrix(m: MatchupMatrix, root: str = MATRIX_DIR):
+    from .columnar import write_columns
+    write_columns(os.path.join(root, m.version), {"home_win": m.home_win.astype(np.float32)},
+                  {**m.meta, "version": m.version, "names": m.names}, overwrite=True)
+
+def load_matrix(ver: str, root: str = MATRIX_DIR) -> Optional[MatchupMatrix]:
+    from .columnar import read_columns
+    try:
+        meta, cols = read_columns(os.path.join(root, ver), mmap=False)
+    except FileNotFoundError:
+        return None
+    return MatchupMatrix(ver, meta.pop("names"), cols["home_win"].astype(float), meta)
+
+_cache: "OrderedDict[str, MatchupMatrix]" = OrderedDict()
+
+def _remember(ver: str, m: MatchupMatrix):
+    _cache[ver] = m
+    while len(_cache) > MAX_CACHED:
+        _cache.popitem(last=False)
+
+def _from_bundled(art, model: BaseDriveModel, teams: Sequence[TeamState], n_per_bucket: int, bucket: float,
+                  seed: int | None, ver: str) -> Optional[MatchupMatrix]:
+    """Rows/columns of the bundled full-field matrix, when it was built under the same
+    model and settings and every team is in it with the same ratings. Buckets replay
+    the same draws whatever else is simulated, so this equals a fresh build."""
+    full = art.matrix
+    if ver == full.version:
+        return full
+    meta = full.meta
+    if (meta.get("model"), meta.get("n_per_bucket"), meta.get("bucket"), meta.get("seed")) != \
+            (model.fingerprint(), n_per_bucket, bucket, seed):
+        return None
+    bundled = {t.name: t for t in art.team_states()}
+    if any(bundled.get(t.name) != t for t in teams):
+        return None
+    idx = [full.index(t.name) for t in teams]
+    return MatchupMatrix(ver, [t.name for t in teams], full.home_win[np.ix_(idx, idx)],
+                         dict(meta, teams=len(teams), pairs=len(teams) * (len(teams) - 1), sliced_from=full.version))
+
+def get_matrix(model: BaseDriveModel, teams: Sequence[TeamState], n_per_bucket: int = 1000,
+               bucket: float = BUCKET, seed: int | None = 0) -> tuple[MatchupMatrix, str]:
+    """The matrix for these teams under this model, and where it came from
+    ("memory", "artifact", "disk" or "built")."""
+    from .artifact import get as get_artifact
+    ver = version(model, teams, n_per_bucket, bucket, seed)
+    if ver in _cache:
+        _cache.move_to_end(ver)
+        return _cache[ver], "memory"
+    art = get_artifact()
+    if art is not None and art.matrix is not None:
+        m = _from_bundled(art, model, teams, n_per_bucket, bucket, seed, ver)
+        if m is not None:
+            _remember(ver, m)
+            return m, "artifact"
+    m = load_matrix(ver) if seed is not None else None
+    source = "disk"
+    if m is None:
+        m = build_matrix(model, teams, n_per_bucket, bucket, seed)
+        source = "built"
+        if seed is not None:
+            try:
+                save_matrix(m)
+            except OSError as e:  # read-only filesystem (serverless); the memory cache still applies
+                print("[matrix] disk cache skipped:", e)
+    if seed is not None:
+        _remember(ver, m)
+    return m, source
+
+def db_teams(conference: str | None = None) -> List[TeamState]:
+    """TeamStates for every team in the DB (optionally one conference), ordered by name.
+    Read from the artifact bundle's ratings snapshot while it is fresh."""
+    from .artifact import get as get_artifact
+    art = get_artifact()
+    if art is not None:
+        return art.team_states(conference)
+    from sqlalchemy import select
+    from .db import SessionLocal
+    from .ingest import init_db
+    from .models import Team
+    init_db()
+    stmt = select(Team).order_by(Team.name.asc())
+    if conference:
+        stmt = stmt.where(Team.conference == conference)
+    with SessionLocal() as sess:
+        return [TeamState(name=t.name, off_rush=t.off_rush or 0, off_pass=t.off_pass or 0,
+                          def_rush=t.def_rush or 0, def_pass=t.def_pass or 0, st=t.st or 0)
+                for t in sess.execute(stmt).scalars().all()]
@@ -0,0 +1,168 @@
+"""In-process performance metrics rendered in the Prometheus text format.
+
+Enabled with METRICS_ENABLED=true. When disabled nothing is installed: the ASGI
+middleware and SQLAlchemy listeners are not registered and the hot paths only
+check the module-level ENABLED flag. Metrics are per process (per serverless
+instance), so scrape or aggregate accordingly.
+"""
+from __future__ import annotations
+import threading
+import time
+from typing import Dict, Iterable, Tuple
+
+from .config import env_true
+
+ENABLED = env_true("METRICS_ENABLED", False)
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+DB_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+def _labels(kw: Dict[str, str]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in kw.items()))
+
+def _fmt_labels(labels: Iterable[Tuple[str, str]]) -> str:
+    parts = []
+    for k, v in labels:
+        v = v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{k}="{v}"')
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+class Counter:
+    def __init__(self, name: str, help: str):
+        self.name, self.help = name, help
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = _labels(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(_labels(labels), 0.0)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, v in sorted(self._values.items()):
+                lines.append(f"{self.name}{_fmt_labels(key)} {v:g}")
+        return lines
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name, self.help, self.buckets = name, help, buckets
+        # per label set: [bucket counts..., +Inf count], sum
+        self._values: Dict[Labels, Tuple[list, list]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = _labels(labels)
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            for i, b in enumerate(self.buckets):
+                if value <= b:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+            total[0] += value
+
+    def count(self, **labels) -> int:
+        entry = self._values.get(_labels(labels))
+        return sum(entry[0]) if entry else 0
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total) in sorted(self._values.items()):
+                cum = 0
+                for b, c in zip(self.buckets, counts):
+                    cum += c
+                    lines.append(f"{self.name}_bucket{_fmt_labels(key + (('le', f'{b:g}'),))} {cum}")
+                cum += counts[-1]
+                lines.append(f"{self.name}_bucket{_fmt_labels(key + (('le', '+Inf'),))} {cum}")
+                lines.append(f"{self.name}_sum{_fmt_labels(key)} {total[0]:.6g}")
+                lines.append(f"{self.name}_count{_fmt_labels(key)} {cum}")
+        return lines
+
+REQUEST_LATENCY = Histogram("http_request_duration_seconds", "Request latency by route template.")
+SIM_GAMES = Counter("sim_games_total", "Games simulated.")
+SIM_DRIVES = Counter("sim_drives_total", "Drives simulated (regulation and overtime).")
+SIM_OT_GAMES = Counter("sim_ot_games_total", "Simulated games that went to overtime.")
+DB_QUERIES = Histogram("db_query_duration_seconds", "DB statement latency by statement type.", DB_BUCKETS)
+CFBD_LATENCY = Histogram("cfbd_request_duration_seconds", "CollegeFootballData API call latency.")
+
+REGISTRY = [REQUEST_LATENCY, SIM_GAMES, SIM_DRIVES, SIM_OT_GAMES, DB_QUERIES, CFBD_LATENCY]
+
+def render() -> str:
+    lines = []
+    for m in REGISTRY:
+        lines.extend(m.render())
+    return "\n".join(lines) + "\n"
+
+def record_games(games: int, drives: int, ot_games: int):
+    SIM_GAMES.inc(games)
+    SIM_DRIVES.inc(drives)
+    if ot_games:
+        SIM_OT_GAMES.inc(ot_games)
+
+def instrument_engine(engine):
+    """Time every statement on `engine` via SQLAlchemy cursor events."""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("_metrics_t0", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        stack = conn.info.get("_metrics_t0")
+        if not stack:
+            return
+        elapsed = time.perf_counter() - stack.pop()
+        op = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+        DB_QUERIES.observe(elapsed, op=op)
+
+class MetricsMiddleware:
+    """ASGI middleware: per-route latency histogram and opt-in sampling profiles.
+
+    Latency is labelled with the matched route template (not the raw path) to keep
+    label cardinality bounded. A request carrying `x-profile: 1` is profiled when
+    PROFILING_ENABLED is set; see `app.profiling`.
+    """
+    def __init__(self, app, metrics: bool = True, profiling: bool = False):
+        self.app = app
+        self.metrics = metrics
+        self.profiling = profiling
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        profiler = None
+        if self.profiling and (b"x-profile", b"1") in scope.get("headers", []):
+            from .profiling import SamplingProfiler
+            profiler = SamplingProfiler()
+            profiler.start()
+        status = 500
+        t0 = time.perf_counter()
+
+        async def _send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if profiler is not None:
+                    profile_id = profiler.stop(label=f"{scope['method']} {scope['path']}")
+                    message = dict(message)
+                    message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            if profiler is not None and profiler.running:
+                profiler.stop(label=f"{scope['method']} {scope['path']}")
+            if self.metrics:
+                route = getattr(scope.get("route"), "path", None) or "unmatched"
+                REQUEST_LATENCY.observe(time.perf_counter() - t0, method=scope["method"], route=route, status=status)
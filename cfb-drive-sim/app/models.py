@@ -18,6 +18,7 @@ class Team(Base):
 class Game(Base):
     __tablename__ = "games"
     game_id = Column(Integer, primary_key=True)
+    cfbd_id = Column(Integer, unique=True)   # CFBD game id; drives are matched to games on it
     season = Column(Integer, nullable=False)
     week = Column(Integer)
     date = Column(String)
@@ -27,3 +28,40 @@ class Game(Base):
     home_pts = Column(Integer)
     away_pts = Column(Integer)
     ot_periods = Column(Integer, default=0)
+
+class Drive(Base):
+    """Real drive ingested from CFBD `/drives`; training data for the drive model.
+
+    `result` is normalised to sim_engine.RESULTS; `start_yardline` is yards to goal.
+    """
+    __tablename__ = "drives"
+    id = Column(Integer, primary_key=True)
+    cfbd_id = Column(String, unique=True)
+    game_id = Column(Integer, ForeignKey("games.game_id"), nullable=False)
+    offense_id = Column(Integer, ForeignKey("teams.team_id"), nullable=False)
+    defense_id = Column(Integer, ForeignKey("teams.team_id"), nullable=False)
+    start_yardline = Column(Integer)
+    start_seconds_left = Column(Integer)
+    start_score_diff = Column(Integer)
+    result = Column(String)
+    points = Column(Integer, default=0)
+    seconds = Column(Integer, default=0)
+    ep_gain = Column(Float)
+
+class SimDrive(Base):
+    """Simulated drive from a series trace (see sim_engine.DriveTrace).
+
+    Kept apart from `drives`, which holds real drives keyed to `games` rows;
+    simulated games have no `games` row. `side` is 0 when the home team has the ball.
+    """
+    __tablename__ = "sim_drives"
+    id = Column(Integer, primary_key=True)
+    trace_id = Column(String, nullable=False, index=True)
+    game_idx = Column(Integer, nullable=False)
+    side = Column(Integer, nullable=False)
+    offense_id = Column(Integer, ForeignKey("teams.team_id"))
+    defense_id = Column(Integer, ForeignKey("teams.team_id"))
+    start_yardline = Column(Integer)
+    result = Column(String)
+    points = Column(Integer, default=0)
+    seconds = Column(Integer, default=0)
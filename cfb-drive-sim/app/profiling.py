@@ -0,0 +1,84 @@
+"""Opt-in per-request sampling profiler.
+
+A background thread snapshots every thread's Python stack (`sys._current_frames`)
+at a fixed interval while a request runs and aggregates them as collapsed stacks
+("outer;inner;leaf count"), the input format of flamegraph.pl / speedscope.
+Sync routes run in a worker thread, so all threads are sampled; idle waits
+(locks, queues, the event loop selector) are dropped.
+
+Profiles are kept in a small in-memory ring buffer and fetched by id from
+`/debug/profile/{profile_id}`. Enable with PROFILING_ENABLED=true and send
+`x-profile: 1` on the request to profile.
+"""
+from __future__ import annotations
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+
+INTERVAL = float(os.getenv("PROFILING_INTERVAL_MS", "5")) / 1000.0
+MAX_PROFILES = 20
+_IDLE_FILES = ("threading.py", "selectors.py", "queue.py")
+
+_profiles: "OrderedDict[str, dict]" = OrderedDict()
+_lock = threading.Lock()
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}"
+
+class SamplingProfiler:
+    def __init__(self, interval: float = INTERVAL):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.running = False
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._t0 = 0.0
+
+    def start(self):
+        self.running = True
+        self._t0 = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for tid, frame in sys._current_frames().items():
+                if tid == me:
+                    continue
+                if os.path.basename(frame.f_code.co_filename) in _IDLE_FILES:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def stop(self, label: str = "") -> str:
+        """Stop sampling, store the profile and return its id."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.running = False
+        profile_id = uuid.uuid4().hex[:12]
+        with _lock:
+            _profiles[profile_id] = {
+                "label": label,
+                "duration_s": time.perf_counter() - self._t0,
+                "samples": self.samples,
+                "interval_s": self.interval,
+                "collapsed": "\n".join(f"{s} {n}" for s, n in self.stacks.most_common()),
+            }
+            while len(_profiles) > MAX_PROFILES:
+                _profiles.popitem(last=False)
+        return profile_id
+
+def get_profile(profile_id: str) -> dict | None:
+    with _lock:
+        return _profiles.get(profile_id)
@@ -0,0 +1,81 @@
+"""Compact binary store for per-game series samples.
+
+A stored result is a columnar dataset (see `app.columnar`) under
+RESULT_DIR/<result_id>/: `home` and `away` scores as int16, `ot` (overtime
+periods played) as int8 and optionally `margin` (home - away) as int16, i.e.
+5-7 bytes per game. Columns are read back as memory maps, so range reads and
+histograms never load more than they touch. `save` raises OSError when
+RESULT_DIR is not writable (the API answers 503).
+"""
+from __future__ import annotations
+import io
+import os
+import re
+import uuid
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from .config import data_dir
+from .series import SeriesResult
+
+RESULT_DIR = data_dir("RESULT_DIR", "results")
+DTYPES = {"home": np.int16, "away": np.int16, "ot": np.int8, "margin": np.int16}
+
+_ID = re.compile(r"[0-9a-f]{16}")
+
+def new_result_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+def result_path(result_id: str) -> str:
+    """RESULT_DIR/<result_id>; ids that `new_result_id` could not have produced (e.g. `..`)
+    raise FileNotFoundError before anything touches the filesystem."""
+    if not _ID.fullmatch(result_id):
+        raise FileNotFoundError(f"invalid result id: {result_id!r}")
+    return os.path.join(RESULT_DIR, result_id)
+
+def save(res: SeriesResult, meta: Optional[Dict[str, Any]] = None, margins: bool = False) -> Dict[str, Any]:
+    from .columnar import write_columns
+    result_id = new_result_id()
+    cols = {
+        "home": np.asarray(res.home_scores, dtype=DTYPES["home"]),
+        "away": np.asarray(res.away_scores, dtype=DTYPES["away"]),
+        "ot": np.minimum(np.asarray(res.ot_periods), np.iinfo(DTYPES["ot"]).max).astype(DTYPES["ot"]),
+    }
+    if margins:
+        cols["margin"] = cols["home"] - cols["away"]
+    write_columns(result_path(result_id), cols, dict(meta or {}, result_id=result_id, games=res.n))
+    return {"id": result_id, "games": res.n, "columns": list(cols),
+            "bytes": int(sum(c.nbytes for c in cols.values()))}
+
+def load(result_id: str, mmap: bool = True):
+    """Return (meta, columns) for a stored result; columns are memory maps by default."""
+    from .columnar import read_columns
+    return read_columns(result_path(result_id), mmap=mmap)
+
+def column(cols: Dict[str, np.ndarray], name: str) -> np.ndarray:
+    """A stored column, or `margin` derived from the scores when it was not stored."""
+    if name == "margin" and "margin" not in cols:
+        return cols["home"].astype(DTYPES["margin"]) - cols["away"]
+    return cols[name]
+
+def histogram(values: np.ndarray) -> Dict[str, Any]:
+    """Exact counts per integer value from `min` to `max`, plus summary statistics."""
+    if not len(values):
+        return {"min": None, "max": None, "counts": [], "mean": None}
+    lo, hi = int(values.min()), int(values.max())
+    counts = np.bincount(np.asarray(values, dtype=np.int64) - lo, minlength=hi - lo + 1)
+    return {"min": lo, "max": hi, "counts": counts.tolist(), "mean": float(values.mean(dtype=np.float64))}
+
+def summary(result_id: str) -> Dict[str, Any]:
+    meta, cols = load(result_id)
+    return {**meta, "histograms": {name: histogram(column(cols, name)) for name in ("home", "away", "margin", "ot")}}
+
+def npy_bytes(values: np.ndarray) -> bytes:
+    buf = io.BytesIO()
+    np.save(buf, np.ascontiguousarray(values), allow_pickle=False)
+    return buf.getvalue()
+
+def raw_bytes(values: np.ndarray) -> bytes:
+    """Little-endian array bytes, no header (dtype and length go in response headers)."""
+    return np.ascontiguousarray(values, dtype=values.dtype.newbyteorder("<")).tobytes()
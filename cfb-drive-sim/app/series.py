@@ -0,0 +1,162 @@
+"""Series runner shared by the /simulate-series endpoints."""
+import random
+from dataclasses import dataclass, field
+from statistics import mean, pstdev
+from .sim_engine import Simulator, TeamState, GameState, DriveTrace
+
+@dataclass
+class SeriesResult:
+    home_scores: list
+    away_scores: list
+    ot_games: int
+    home_wins: int
+    variance: dict | None = field(default=None)   # variance-reduced estimates, see run_variance_reduced
+    ot_periods: list = field(default_factory=list)  # per game
+
+    @property
+    def n(self) -> int:
+        return len(self.home_scores)
+
+def resolve_engine(sim: Simulator, engine: str | None) -> str:
+    """Explicit engine, else "batch" for models that prefer batched inference."""
+    if engine:
+        return engine
+    return "batch" if getattr(sim.model, "batched", False) else "loop"
+
+def run_series(sim: Simulator, home: TeamState, away: TeamState, n: int,
+               seed: int | None = None, trace: DriveTrace | None = None,
+               engine: str | None = None, variance: str | None = None) -> SeriesResult:
+    """Play `n` games. "loop" calls sim_game per game (seeded per game, as before);
+    "batch" plays all games in lockstep with one model call per drive step.
+    A `variance` mode always runs on the batch engine."""
+    if variance:
+        return run_variance_reduced(sim, home, away, n, variance, seed=seed, trace=trace)
+    if resolve_engine(sim, engine) == "batch":
+        out = sim.sim_batch(home, away, n, seed=seed, trace=trace)
+        return SeriesResult(out.score_home.tolist(), out.score_away.tolist(),
+                            int((out.ot_periods > 0).sum()), int((out.score_home > out.score_away).sum()),
+                            ot_periods=out.ot_periods.tolist())
+    rng = random.Random(seed)
+    home_scores = []
+    away_scores = []
+    ot_games = 0
+    home_wins = 0
+    ot_periods = []
+    for i in range(n):
+        s = rng.randrange(0, 10_000_000)
+        gs = GameState(home=home, away=away)
+        out = sim.sim_game(gs, seed=s, trace=trace)
+        home_scores.append(out.score_home)
+        away_scores.append(out.score_away)
+        ot_periods.append(out.ot_periods)
+        if out.ot_periods > 0:
+            ot_games += 1
+        if out.score_home > out.score_away:
+            home_wins += 1
+    return SeriesResult(home_scores, away_scores, ot_games, home_wins, ot_periods=ot_periods)
+
+VARIANCE_MODES = ("antithetic", "stratified", "control", "antithetic+control", "stratified+control")
+REPLICATES = 20  # independent stratified blocks; their spread gives the standard error
+CONTROLS = 2     # control variates per game (home and away points minus expected points)
+# Smallest n per mode that leaves degrees of freedom for the standard error (and, with
+# control variates, for the regression on them).
+MIN_GAMES = {"antithetic": 4, "stratified": 4, "control": 2 * (CONTROLS + 2),
+             "antithetic+control": 2 * (CONTROLS + 2), "stratified+control": 2 * (CONTROLS + 2)}
+
+def run_variance_reduced(sim: Simulator, home: TeamState, away: TeamState, n: int, mode: str,
+                         seed: int | None = None, trace: DriveTrace | None = None) -> SeriesResult:
+    """Batch-engine series with a variance-reduction scheme.
+
+    - antithetic: games come in pairs drawing u and 1 - u (n rounded up to even).
+    - stratified: every drive step's uniforms are Latin-hypercube stratified
+      across games, in REPLICATES independent blocks (n rounded up to a multiple).
+    - control: each side's points minus the drive model's expected points,
+      summed over regulation drives, are zero-mean control variates; outcomes
+      are adjusted by their regression on them. Combines with either scheme.
+
+    Estimates of win probability and mean scores carry a standard error and an
+    effective sample size: the number of plain Monte Carlo games with the same
+    standard error. Adjusted estimates are clipped to their range (probabilities
+    to [0, 1], scores to >= 0). Raises ValueError below MIN_GAMES[mode] games.
+    """
+    import numpy as np
+    from .batch_sim import AntitheticUniforms, StratifiedUniforms
+    if mode not in VARIANCE_MODES:
+        raise ValueError(f"unknown variance mode {mode!r}; expected one of {VARIANCE_MODES}")
+    if n < MIN_GAMES[mode]:
+        raise ValueError(f"variance mode {mode!r} needs n >= {MIN_GAMES[mode]}")
+    scheme, _, cv = mode.partition("+")
+    if scheme == "control":
+        scheme, cv = "", "control"
+    groups, uniforms = 0, None
+    if scheme == "antithetic":
+        n += n % 2
+        uniforms = AntitheticUniforms(seed)
+    elif scheme == "stratified":
+        groups = max(2, min(REPLICATES, n // 2))
+        n = -(-n // groups) * groups
+        uniforms = StratifiedUniforms(n // groups, seed)
+    control = np.zeros((n, 2)) if cv else None
+    out = sim.sim_batch(home, away, n, seed=seed, uniforms=uniforms, trace=trace, control=control)
+    sh, sa, ot = out.score_home, out.score_away, out.ot_periods
+    targets = {"home_win_pct": ((sh > sa).astype(float), 1.0), "mean_score_home": (sh.astype(float), None),
+               "mean_score_away": (sa.astype(float), None)}
+    estimates = {name: _estimate(y, scheme, control, groups, hi=hi) for name, (y, hi) in targets.items()}
+    return SeriesResult(sh.tolist(), sa.tolist(), int((ot > 0).sum()), int((sh > sa).sum()),
+                        variance={"mode": mode, "estimates": estimates}, ot_periods=ot.tolist())
+
+def _estimate(y, scheme: str, control, groups: int, lo: float = 0.0, hi: float | None = None) -> dict:
+    import numpy as np
+    n = len(y)
+    plain = y.var(ddof=1)
+    dof = 1
+    if control is not None:
+        # Controls have known mean 0, so subtracting their fitted effect keeps the estimator unbiased.
+        C = control - control.mean(axis=0)
+        beta = np.linalg.lstsq(C, y - y.mean(), rcond=None)[0]
+        y = y - control @ beta
+        dof += control.shape[1]
+    if scheme == "antithetic":
+        z = (y[0::2] + y[1::2]) / 2
+        se2 = z.var(ddof=1) / len(z)
+    elif scheme == "stratified":
+        z = y.reshape(groups, -1).mean(axis=1)
+        se2 = z.var(ddof=1) / groups
+    else:
+        se2 = y.var(ddof=dof) / n
+    ess = n if se2 <= 0 else min(plain / se2, 1e3 * n)
+    value = max(lo, float(y.mean())) if hi is None else min(hi, max(lo, float(y.mean())))
+    return {"value": value, "stderr": float(np.sqrt(max(se2, 0.0))), "effective_samples": float(ess)}
+
+def quantile(arr, pct, presorted: bool = False):
+    if not arr:
+        return None
+    srt = arr if presorted else sorted(arr)
+    k = max(0, min(len(srt)-1, int(round((pct/100.0)*(len(srt)-1)))))
+    return srt[k]
+
+def summarize(res: SeriesResult) -> dict:
+    n = res.n
+    hs, as_ = res.home_scores, res.away_scores
+    hs_sorted, as_sorted = sorted(hs), sorted(as_)
+    out = {
+        "samples": n,
+        "home_win_pct": res.home_wins/n,
+        "away_win_pct": (n - res.home_wins)/n,
+        "ot_rate": res.ot_games/n,
+        "mean_score_home": mean(hs),
+        "mean_score_away": mean(as_),
+        "stdev_score_home": pstdev(hs),
+        "stdev_score_away": pstdev(as_),
+        "quantiles": {
+            "home": {f"p{p:02d}": quantile(hs_sorted, p, presorted=True) for p in (5, 50, 95)},
+            "away": {f"p{p:02d}": quantile(as_sorted, p, presorted=True) for p in (5, 50, 95)},
+        },
+    }
+    if res.variance:
+        est = res.variance["estimates"]
+        wp = min(1.0, max(0.0, est["home_win_pct"]["value"]))
+        out.update(home_win_pct=wp, away_win_pct=1 - wp,
+                   mean_score_home=est["mean_score_home"]["value"], mean_score_away=est["mean_score_away"]["value"],
+                   effective_samples=est["home_win_pct"]["effective_samples"], variance_reduction=res.variance)
+    return out
@@ -1,10 +1,16 @@
+import copy
+import os
+from abc import ABC, abstractmethod
 import random
 import math
+from array import array
 from dataclasses import dataclass
 from typing import Dict
 from .features import DriveContext, to_features
+from . import metrics
 
 RESULTS = ["TD", "FG", "PUNT", "TO", "DOWNS", "ENDHALF"]
+RESULT_CODE = {k: i for i, k in enumerate(RESULTS)}
 
 @dataclass
 class TeamState:
@@ -24,31 +30,85 @@ class GameState:
     score_away: int = 0
     possession: str = "home"
     ot_periods: int = 0
+    # Field position (yards to goal) of the drive in progress; later drives start at the 75.
+    yardline: int = 75
+    timeouts_home: int = 3
+    timeouts_away: int = 3
 
-from .model_params import get_param
+class DriveTrace:
+    """Drive-level record of simulated games, one row per drive in compact typed arrays.
+
+    `game` is the 0-based index of the game within the trace, `offense` is 0 for the
+    home team and 1 for away, `result` indexes RESULTS. Overtime drives start at the
+    25 with `seconds` 0; their `points` include the extra point / 2-pt try. The
+    alternating 2-pt tries from the third OT period on are not drives and are not
+    recorded.
+    """
+    COLUMNS = ("game", "offense", "start_yardline", "result", "points", "seconds")
 
-class DriveModel:
     def __init__(self):
-        self.base_coef = [0.6, 0.1, -0.05, 0.25, 0.25, 0.05, 0.02, -0.02]
-        self.coef_scale = get_param('coef_scale', 1.0)
-        self._refresh()
+        self.game = array("i")
+        self.offense = array("b")
+        self.start_yardline = array("b")
+        self.result = array("b")
+        self.points = array("b")
+        self.seconds = array("h")
+        self.games = 0
 
-    def _refresh(self):
-        s = float(self.coef_scale or 1.0)
-        self.coef = [c*s for c in self.base_coef]
+    def __len__(self):
+        return len(self.game)
+
+    def add(self, game: int, offense: int, yardline: int, result: str, points: int, seconds: int):
+        self.game.append(game)
+        self.offense.append(offense)
+        self.start_yardline.append(yardline)
+        self.result.append(RESULT_CODE[result])
+        self.points.append(points)
+        self.seconds.append(seconds)
+
+    def extend(self, game, offense, start_yardline, result, points, seconds):
+        """Append many drives at once from numpy arrays (used by the batch engine)."""
+        for name, values in zip(self.COLUMNS, (game, offense, start_yardline, result, points, seconds)):
+            col = getattr(self, name)
+            col.frombytes(values.astype(col.typecode).tobytes())
+
+    def columns(self) -> dict:
+        return {c: getattr(self, c) for c in self.COLUMNS}
+
+class BaseDriveModel(ABC):
+    """Drive outcome model interface.
+
+    `probs(x)` maps one feature row (see features.to_features) to {result: p};
+    `probs_batch(X)` returns a (len(X), len(RESULTS)) array in RESULTS order and is
+    what the batch engine calls once per drive step for every live game. Models
+    that are expensive per call (trained classifiers) set `batched = True` so
+    series default to the batch engine.
+    """
+    batched = False
+    coef_scale = 1.0
 
     def probs(self, x):
-        z = sum(c*v for c, v in zip(self.coef, x))
-        base = {
-            "TD": 0.18 + 0.20*z,
-            "FG": 0.10 + 0.05*z,
-            "PUNT": 0.52 - 0.30*z,
-            "TO": 0.08 - 0.02*z,
-            "DOWNS": 0.07 - 0.02*z,
-            "ENDHALF": 0.05 - 0.01*z,
-        }
-        total = sum(max(0.001, v) for v in base.values())
-        return {k: max(0.001, v)/total for k, v in base.items()}
+        row = self.probs_batch([x])[0]
+        return dict(zip(RESULTS, row.tolist()))
+
+    @abstractmethod
+    def probs_batch(self, X):
+        ...
+
+    def _refresh(self):
+        pass
+
+    def fingerprint(self) -> str:
+        """Identifies the model's parameters; caches built from the model are keyed on it."""
+        return f"{type(self).__name__}:{self.coef_scale}"
+
+    def with_coef_scale(self, scale: float) -> "BaseDriveModel":
+        """A copy with a new coef_scale. Models in use are never changed in place
+        (see app.snapshots); parameter updates build a new one with this."""
+        m = copy.copy(self)
+        m.coef_scale = scale
+        m._refresh()
+        return m
 
     def sample(self, probs: Dict[str, float]):
         r = random.random()
@@ -59,22 +119,69 @@ class DriveModel:
                 return k
         return RESULTS[-1]
 
+class DriveModel(BaseDriveModel):
+    """Hand-coded linear drive model; the zero-dependency default."""
+    # Outcome formula p_k = intercept_k + slope_k * z (floored at 0.001, renormalised), RESULTS order.
+    INTERCEPT = (0.18, 0.10, 0.52, 0.08, 0.07, 0.05)
+    SLOPE = (0.20, 0.05, -0.30, -0.02, -0.02, -0.01)
+
+    def __init__(self, coef_scale: float | None = None):
+        self.base_coef = [0.6, 0.1, -0.05, 0.25, 0.25, 0.05, 0.02, -0.02]
+        if coef_scale is None:
+            # Imported here so that importing the engine does not pull in SQLAlchemy.
+            from .model_params import get_param
+            coef_scale = get_param('coef_scale', 1.0)
+        self.coef_scale = coef_scale
+        self._refresh()
+
+    def _refresh(self):
+        s = float(self.coef_scale or 1.0)
+        self.coef = [c*s for c in self.base_coef]
+
+    def probs(self, x):
+        z = sum(c*v for c, v in zip(self.coef, x))
+        base = {k: a + b*z for k, a, b in zip(RESULTS, self.INTERCEPT, self.SLOPE)}
+        total = sum(max(0.001, v) for v in base.values())
+        return {k: max(0.001, v)/total for k, v in base.items()}
+
+    def fingerprint(self) -> str:
+        return f"linear:{float(self.coef_scale or 1.0)!r}"
+
+    def probs_batch(self, X):
+        import numpy as np
+        z = np.asarray(X, dtype=float) @ np.asarray(self.coef)
+        p = np.maximum(0.001, np.asarray(self.INTERCEPT) + np.outer(z, self.SLOPE))
+        return p / p.sum(axis=1, keepdims=True)
+
+def default_drive_model(coef_scale: float | None = None) -> BaseDriveModel:
+    """Trained model from DRIVE_MODEL_PATH when set, else the linear DriveModel
+    (coef_scale from model_params unless given)."""
+    path = os.getenv("DRIVE_MODEL_PATH")
+    if path:
+        from .drive_model import TrainedDriveModel
+        return TrainedDriveModel.load(path)
+    return DriveModel(coef_scale=coef_scale)
+
 class Simulator:
-    def __init__(self):
-        self.model = DriveModel()
+    def __init__(self, model: BaseDriveModel | None = None):
+        self.model = model if model is not None else default_drive_model()
 
-    def set_coef_scale(self, scale: float):
-        self.model.coef_scale = scale
-        self.model._refresh()
+    def with_coef_scale(self, scale: float) -> "Simulator":
+        return Simulator(self.model.with_coef_scale(scale))
 
-    def sim_game(self, gs: GameState, seed: int | None = None) -> GameState:
+    def sim_game(self, gs: GameState, seed: int | None = None, trace: DriveTrace | None = None) -> GameState:
         if seed is not None:
             random.seed(seed)
+        if trace is not None:
+            game_idx = trace.games
+            trace.games += 1
+        drives = 0
         while gs.seconds_left > 0:
+            drives += 1
             offense = gs.home if gs.possession == "home" else gs.away
             defense = gs.away if gs.possession == "home" else gs.home
             ctx = DriveContext(
-                yardline=75,
+                yardline=gs.yardline,
                 seconds_left=gs.seconds_left,
                 score_diff=(gs.score_home - gs.score_away) if gs.possession == "home" else (gs.score_away - gs.score_home),
                 off_rush=offense.off_rush,
@@ -82,12 +189,14 @@ class Simulator:
                 def_rush=defense.def_rush,
                 def_pass=defense.def_pass,
                 st=(offense.st + defense.st)/2,
-                timeouts_off=3,
-                timeouts_def=3,
+                timeouts_off=gs.timeouts_home if gs.possession == "home" else gs.timeouts_away,
+                timeouts_def=gs.timeouts_away if gs.possession == "home" else gs.timeouts_home,
             )
             x = to_features(ctx)
             probs = self.model.probs(x)
             res = self.model.sample(probs)
+            if trace is not None:
+                before = (gs.seconds_left, gs.score_home + gs.score_away)
             if res == "TD":
                 if gs.possession == "home":
                     gs.score_home += 7
@@ -106,14 +215,30 @@ class Simulator:
                 gs.seconds_left -= 140
             else:  # ENDHALF
                 gs.seconds_left = 0
+            if trace is not None:
+                trace.add(game_idx, 0 if gs.possession == "home" else 1, ctx.yardline, res,
+                          gs.score_home + gs.score_away - before[1], before[0] - max(gs.seconds_left, 0))
             gs.possession = "away" if gs.possession == "home" else "home"
+            gs.yardline = 75
 
+        ot_before = gs.ot_periods
         if gs.score_home == gs.score_away:
-            self._simulate_overtime(gs)
+            self._simulate_overtime(gs, trace=trace, game_idx=game_idx if trace is not None else 0)
+        if metrics.ENABLED:
+            # OT rounds 1-2 are one drive per team; later rounds are 2-pt tries only.
+            ot_rounds = gs.ot_periods - ot_before
+            metrics.record_games(1, drives + 2 * min(ot_rounds, 2), 1 if ot_rounds else 0)
         return gs
 
+    def sim_batch(self, home, away, n: int, seed: int | None = None, uniforms=None,
+                  trace: DriveTrace | None = None, start=None, control=None):
+        """Play `n` games at once with the lockstep engine (see app.batch_sim)."""
+        from .batch_sim import simulate
+        return simulate(self.model, home, away, n, seed=seed, uniforms=uniforms, trace=trace, start=start,
+                        control=control)
+
     # --- Overtime helpers ---
-    def _drive_from_25(self, offense: TeamState, defense: TeamState) -> tuple[int, bool]:
+    def _drive_from_25(self, offense: TeamState, defense: TeamState) -> tuple[int, bool, str]:
         ctx = DriveContext(
             yardline=25,
             seconds_left=0,
@@ -132,10 +257,10 @@ class Simulator:
         probs = {k: v/total for k, v in probs.items()}
         res = self.model.sample(probs)
         if res == "TD":
-            return 6, True
+            return 6, True, res
         if res == "FG":
-            return 3, False
-        return 0, False
+            return 3, False, res
+        return 0, False, res
 
     def _xp_good(self, st: float) -> bool:
         p = max(0.90, min(0.999, 0.98 + 0.0005 * (st/1.0)))
@@ -147,7 +272,7 @@ class Simulator:
         p = max(0.30, min(0.70, p))
         return random.random() < p
 
-    def _simulate_overtime(self, gs: GameState):
+    def _simulate_overtime(self, gs: GameState, trace: DriveTrace | None = None, game_idx: int = 0):
         ot = 0
         start = "home"
         while True:
@@ -160,21 +285,18 @@ class Simulator:
                 for side in order:
                     offense = gs.home if side == "home" else gs.away
                     defense = gs.away if side == "home" else gs.home
-                    pts, td = self._drive_from_25(offense, defense)
+                    pts, td, res = self._drive_from_25(offense, defense)
+                    if td:
+                        if ot == 1:
+                            pts += 1 if self._xp_good(offense.st) else 0
+                        else:
+                            pts += 2 if self._two_point_good(offense, defense) else 0
                     if side == "home":
                         delta_home += pts
-                        if td:
-                            if ot == 1:
-                                delta_home += 1 if self._xp_good(offense.st) else 0
-                            else:
-                                delta_home += 2 if self._two_point_good(offense, defense) else 0
                     else:
                         delta_away += pts
-                        if td:
-                            if ot == 1:
-                                delta_away += 1 if self._xp_good(offense.st) else 0
-                            else:
-                                delta_away += 2 if self._two_point_good(offense, defense) else 0
+                    if trace is not None:
+                        trace.add(game_idx, 0 if side == "home" else 1, 25, res, pts, 0)
                 gs.score_home += delta_home
                 gs.score_away += delta_away
                 if gs.score_home != gs.score_away:
@@ -0,0 +1,147 @@
+"""Immutable, versioned drive-model snapshots published by reference swap.
+
+A request calls `current()` once and runs entirely on that snapshot's
+Simulator, so a series never mixes coefficient sets even if the model is
+updated while it runs. Updates never touch a model in use: they build a new
+one (`BaseDriveModel.with_coef_scale`) and `publish` it, which swaps the
+module-level reference. Reading one reference is atomic, so readers take no
+lock; publishers serialise on one.
+
+Snapshots are identified by their model's `fingerprint`, which encodes the
+parameters, so the same id means the same coefficients on every serverless
+instance. The last KEEP snapshots stay retained, so A/B runs can replay a
+previous model next to the current one; a linear-model fingerprint that is not
+retained in this process is rebuilt from the current model (`get`) when its
+coef_scale is in a plausible range, and any other unknown one is reported as
+missing rather than substituted. Rebuilt snapshots are not retained, so
+requests naming arbitrary versions cannot push published ones out.
+"""
+from __future__ import annotations
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from .sim_engine import BaseDriveModel, Simulator
+
+KEEP = int(os.getenv("MODEL_SNAPSHOTS_KEEP", "5"))
+MAX_REBUILT_SCALE = 4.0  # calibration searches 0.5-2.0; anything past this is not a real version
+
+@dataclass(frozen=True)
+class ModelSnapshot:
+    sim: Simulator
+    fingerprint: str        # the snapshot's id (API `model_version`)
+    source: str             # what published it: "startup", "artifact", "params", "calibrate", ...
+    created_at: str
+
+    @property
+    def model(self) -> BaseDriveModel:
+        return self.sim.model
+
+    def info(self) -> Dict[str, Any]:
+        return {"fingerprint": self.fingerprint, "source": self.source, "created_at": self.created_at}
+
+_current: Optional[ModelSnapshot] = None
+_history: "OrderedDict[str, ModelSnapshot]" = OrderedDict()
+_lock = threading.Lock()
+_reconciled = False
+
+def _snapshot(model: BaseDriveModel, source: str) -> ModelSnapshot:
+    return ModelSnapshot(Simulator(model), model.fingerprint(), source, datetime.now(timezone.utc).isoformat())
+
+def _retain(snap: ModelSnapshot):
+    _history[snap.fingerprint] = snap
+    _history.move_to_end(snap.fingerprint)
+    while len(_history) > KEEP:
+        oldest = next(iter(_history))
+        if _history[oldest] is _current:  # never drop the live snapshot
+            _history.move_to_end(oldest)
+        else:
+            _history.popitem(last=False)
+
+def _publish(model: BaseDriveModel, source: str) -> ModelSnapshot:
+    global _current
+    snap = _snapshot(model, source)
+    _retain(snap)
+    _current = snap
+    return snap
+
+def _initial() -> ModelSnapshot:
+    # Built on the first simulation, never at import. coef_scale comes from MODEL_COEF_SCALE or
+    # the bundled params (app.artifact) without a DB query, so DB-free routes stay DB-free when
+    # either is configured; `reconcile()` later moves to the DB's value on a DB-backed route.
+    # Otherwise the calibrated value is read from model_params here, as Simulator() always did.
+    global _reconciled
+    from .artifact import get as get_artifact
+    from .sim_engine import default_drive_model
+    env = os.getenv("MODEL_COEF_SCALE")
+    if env:
+        return _publish(default_drive_model(coef_scale=float(env)), "env")
+    art = get_artifact(verified=False)
+    if art is not None:
+        return _publish(default_drive_model(coef_scale=art.params.get("coef_scale", 1.0)), "artifact")
+    from .model_params import get_param
+    snap = _publish(default_drive_model(coef_scale=get_param("coef_scale", 1.0)), "db")
+    _reconciled = True
+    return snap
+
+def current() -> ModelSnapshot:
+    """The live snapshot; the first call builds it."""
+    snap = _current
+    if snap is None:
+        with _lock:
+            snap = _current if _current is not None else _initial()
+    return snap
+
+def publish(model: BaseDriveModel, source: str) -> ModelSnapshot:
+    with _lock:
+        return _publish(model, source)
+
+def publish_coef_scale(scale: float, source: str) -> ModelSnapshot:
+    """Publish the current model with a new coef_scale (no-op if unchanged)."""
+    base = current()
+    if float(base.model.coef_scale or 1.0) == float(scale or 1.0):
+        return base
+    return publish(base.model.with_coef_scale(scale), source)
+
+def reconcile(scale: float | None = None) -> ModelSnapshot:
+    """Once per process, publish the DB's coef_scale (read here unless the caller just
+    read it) if the first snapshot differs from it."""
+    global _reconciled
+    snap = current()
+    if _reconciled:
+        return snap
+    if scale is None:
+        from .model_params import get_param
+        try:
+            scale = get_param("coef_scale", 1.0)
+        except Exception as e:  # DB unreachable: keep the env/bundled scale, retry on the next call
+            print("[snapshots] reconcile skipped:", e)
+            return snap
+    snap = publish_coef_scale(scale, source="db")
+    _reconciled = True
+    return snap
+
+def get(fingerprint: str) -> Optional[ModelSnapshot]:
+    """The snapshot with this fingerprint: a retained one, else (unretained) the current model
+    with the coef_scale the fingerprint names, if that is in (0, MAX_REBUILT_SCALE] and
+    reproduces the fingerprint exactly; None otherwise."""
+    snap = _history.get(fingerprint)
+    if snap is not None:
+        return snap
+    try:
+        scale = float(fingerprint.rsplit(":", 1)[1])
+    except (IndexError, ValueError):
+        return None
+    if not 0.0 < scale <= MAX_REBUILT_SCALE:  # also rejects nan
+        return None
+    model = current().model.with_coef_scale(scale)
+    if model.fingerprint() != fingerprint:
+        return None
+    return _snapshot(model, "rebuilt")
+
+def history() -> List[Dict[str, Any]]:
+    live = current()
+    return [dict(s.info(), current=s is live) for s in list(_history.values())]
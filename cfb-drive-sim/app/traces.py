@@ -0,0 +1,93 @@
+"""Persist and read back drive traces captured by series runs.
+
+Two sinks:
+- "file": one memory-mappable `.npy` per column under TRACE_DIR/<trace_id>/
+  (see `app.columnar`); cheap enough for 100k-game traces. Writes raise
+  OSError when the directory is not writable (the API answers 503).
+- "db": bulk insert into `sim_drives` (executemany in chunks; COPY on Postgres).
+"""
+from __future__ import annotations
+import csv
+import io
+import os
+import re
+import uuid
+from typing import Any, Dict, Optional
+from .config import data_dir
+from .sim_engine import DriveTrace, RESULTS
+
+TRACE_DIR = data_dir("TRACE_DIR", "traces")
+DB_CHUNK = 50_000
+
+_DB_COLUMNS = ("trace_id", "game_idx", "side", "offense_id", "defense_id",
+               "start_yardline", "result", "points", "seconds")
+
+_ID = re.compile(r"[0-9a-f]{16}")
+
+def new_trace_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+def trace_path(trace_id: str) -> str:
+    """TRACE_DIR/<trace_id>; ids that `new_trace_id` could not have produced (e.g. `..`)
+    raise FileNotFoundError before anything touches the filesystem."""
+    if not _ID.fullmatch(trace_id):
+        raise FileNotFoundError(f"invalid trace id: {trace_id!r}")
+    return os.path.join(TRACE_DIR, trace_id)
+
+def save_file(trace: DriveTrace, trace_id: str, meta: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    from .columnar import write_columns
+    meta = dict(meta or {}, trace_id=trace_id, games=trace.games, drives=len(trace), results=RESULTS)
+    return write_columns(trace_path(trace_id), trace.columns(), meta)
+
+def load_file(trace_id: str, mmap: bool = True):
+    """Return (meta, columns) for a file trace; columns are memory maps by default."""
+    from .columnar import read_columns
+    return read_columns(trace_path(trace_id), mmap=mmap)
+
+def _rows(trace: DriveTrace, trace_id: str, home_id: Optional[int], away_id: Optional[int]):
+    ids = (home_id, away_id)
+    for g, side, yl, res, pts, secs in zip(trace.game, trace.offense, trace.start_yardline,
+                                           trace.result, trace.points, trace.seconds):
+        yield (trace_id, g, side, ids[side], ids[1 - side], yl, RESULTS[res], pts, secs)
+
+def save_db(trace: DriveTrace, trace_id: str, home_id: Optional[int] = None, away_id: Optional[int] = None) -> int:
+    from .db import engine
+    from .ingest import init_db
+    from .models import SimDrive
+    init_db()
+    rows = _rows(trace, trace_id, home_id, away_id)
+    if engine.dialect.name == "postgresql":
+        raw = engine.raw_connection()
+        try:
+            cur = raw.cursor()
+            if hasattr(cur, "copy_expert"):  # psycopg2
+                buf = io.StringIO()
+                w = csv.writer(buf)
+                for r in rows:
+                    w.writerow(["" if v is None else v for v in r])
+                buf.seek(0)
+                cur.copy_expert(f"COPY sim_drives ({', '.join(_DB_COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buf)
+                raw.commit()
+                return len(trace)
+        finally:
+            raw.close()
+    table = SimDrive.__table__
+    with engine.begin() as conn:
+        chunk = []
+        for r in rows:
+            chunk.append(dict(zip(_DB_COLUMNS, r)))
+            if len(chunk) >= DB_CHUNK:
+                conn.execute(table.insert(), chunk)
+                chunk = []
+        if chunk:
+            conn.execute(table.insert(), chunk)
+    return len(trace)
+
+def store(trace: DriveTrace, sink: str, meta: Optional[Dict[str, Any]] = None,
+          home_id: Optional[int] = None, away_id: Optional[int] = None) -> Dict[str, Any]:
+    trace_id = new_trace_id()
+    if sink == "db":
+        save_db(trace, trace_id, home_id=home_id, away_id=away_id)
+    else:
+        save_file(trace, trace_id, meta)
+    return {"id": trace_id, "sink": sink, "games": trace.games, "drives": len(trace)}
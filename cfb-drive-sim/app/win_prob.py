@@ -0,0 +1,210 @@
+"""Live win probability from an arbitrary in-game state.
+
+A precomputed grid holds the home team's win probability over
+(seconds_left, score_diff, possession, rating_diff), each cell estimated by
+simulating games from that state with the batch engine. A lookup expands the
+drive in progress exactly: one drive-model call at the given field position and
+timeouts gives the outcome probabilities, and each outcome's resulting state
+(clock, score, other team's ball at the 75) is read off the grid with linear
+interpolation in seconds and rating_diff. That keeps lookups in the
+microsecond range while still reflecting field position and timeouts.
+
+rating_diff is the home team's average unit edge (offense minus opposing
+defense, over rush and pass) minus the away team's. Grid games use teams whose
+ratings are all +rating_diff/4 (home) and -rating_diff/4 (away) with neutral
+special teams, so matchups with very unequal units are approximated. States
+outside the grid's ranges, or any state when the grid is missing or was built
+with a different model, are simulated on demand.
+
+    python -m app.win_prob build [--n 200] [--seed 0]
+"""
+from __future__ import annotations
+import argparse
+import math
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from .batch_sim import POINTS, SECONDS, ENDHALF, RandomUniforms, StartState, simulate
+from .features import DriveContext, to_features
+from .sim_engine import RESULTS, BaseDriveModel, TeamState
+
+GRID_PATH = os.getenv("WP_GRID_PATH", os.path.join("data", "wp_grid"))
+
+SECONDS_AXIS = (0, 3600, 120)     # start, stop (inclusive), step
+DIFF_AXIS = (-35, 35)             # score_diff (home - away), every integer
+RATING_AXIS = (-200, 200, 25)
+MAX_LOOKUP_DIFF = 28              # one more score must still land on the grid
+_OUTCOMES = [(k, r, int(POINTS[k]), int(SECONDS[k])) for k, r in enumerate(RESULTS)]
+
+def rating_diff(home: TeamState, away: TeamState) -> float:
+    home_edge = ((home.off_rush - away.def_rush) + (home.off_pass - away.def_pass)) / 2
+    away_edge = ((away.off_rush - home.def_rush) + (away.off_pass - home.def_pass)) / 2
+    return home_edge - away_edge
+
+@dataclass
+class WPGrid:
+    wp: np.ndarray          # (seconds, diff, possession[0=home ball], rating) home win probability
+    fingerprint: str
+    meta: Dict[str, Any]
+
+    def __post_init__(self):
+        self._s0, self._s1, self._ss = self.meta["seconds_axis"]
+        self._d0, self._d1 = self.meta["diff_axis"]
+        self._r0, self._r1, self._rs = self.meta["rating_axis"]
+        self._ns = self.wp.shape[0]
+        self._nr = self.wp.shape[3]
+
+    def covers(self, seconds_left: float, score_diff: int, rd: float) -> bool:
+        return (self._s0 <= seconds_left <= self._s1 and self._d0 <= score_diff <= self._d1
+                and self._r0 <= rd <= self._r1)
+
+    def at(self, seconds_left: float, score_diff: int, home_ball: bool, rd: float) -> float:
+        """Interpolated grid value; caller checks `covers` first."""
+        fs = (seconds_left - self._s0) / self._ss
+        i = min(int(fs), self._ns - 2)
+        ts = fs - i
+        fr = (rd - self._r0) / self._rs
+        k = min(int(fr), self._nr - 2)
+        tr = fr - k
+        d = int(score_diff) - self._d0
+        p = 0 if home_ball else 1
+        item = self.wp.item
+        return ((1 - ts) * ((1 - tr) * item(i, d, p, k) + tr * item(i, d, p, k + 1))
+                + ts * ((1 - tr) * item(i + 1, d, p, k) + tr * item(i + 1, d, p, k + 1)))
+
+def build_grid(model: BaseDriveModel, n_per_cell: int = 200, seed: int | None = 0,
+               cells_per_batch: int = 2_000) -> WPGrid:
+    secs = np.arange(SECONDS_AXIS[0], SECONDS_AXIS[1] + 1, SECONDS_AXIS[2])
+    diffs = np.arange(DIFF_AXIS[0], DIFF_AXIS[1] + 1)
+    ratings = np.arange(RATING_AXIS[0], RATING_AXIS[1] + 1, RATING_AXIS[2])
+    S, D, P, R = (a.ravel() for a in np.meshgrid(secs, diffs, [True, False], ratings, indexing="ij"))
+    wins = np.empty(S.size)
+    src = RandomUniforms(seed)
+    t0 = time.perf_counter()
+    for lo in range(0, S.size, cells_per_batch):
+        hi = min(S.size, lo + cells_per_batch)
+        rep = lambda a: np.repeat(a[lo:hi], n_per_cell)
+        r = rep(R) / 4.0
+        H = np.column_stack([r, r, r, r, np.zeros_like(r)])
+        d = rep(D)
+        start = StartState(seconds_left=rep(S), score_home=np.maximum(d, 0), score_away=np.maximum(-d, 0),
+                           home_ball=rep(P))
+        out = simulate(model, H, -H, len(r), uniforms=src, start=start)
+        wins[lo:hi] = (out.score_home > out.score_away).reshape(hi - lo, n_per_cell).mean(axis=1)
+    wp = wins.reshape(secs.size, diffs.size, 2, ratings.size).astype(np.float32)
+    meta = {
+        "seconds_axis": list(SECONDS_AXIS), "diff_axis": list(DIFF_AXIS), "rating_axis": list(RATING_AXIS),
+        "n_per_cell": n_per_cell, "seed": seed, "fingerprint": model.fingerprint(),
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "build_seconds": round(time.perf_counter() - t0, 2),
+    }
+    return WPGrid(wp, meta["fingerprint"], meta)
+
+def save_grid(grid: WPGrid, path: str = GRID_PATH):
+    from .columnar import write_columns
+    write_columns(path, {"wp": grid.wp}, grid.meta, overwrite=True)
+
+def load_grid(path: str = GRID_PATH) -> Optional[WPGrid]:
+    from .columnar import read_columns
+    try:
+        meta, cols = read_columns(path, mmap=True)
+    except FileNotFoundError:
+        return None
+    return WPGrid(cols["wp"], meta["fingerprint"], meta)
+
+_grid: Optional[WPGrid] = None
+_grid_loaded = False
+
+def current_grid(model: BaseDriveModel) -> Optional[WPGrid]:
+    """The on-disk grid (loaded once; GRID_PATH, else the artifact bundle's), if it
+    was built with this model's parameters."""
+    global _grid, _grid_loaded
+    if not _grid_loaded:
+        _grid = load_grid()
+        if _grid is None:
+            from .artifact import get as get_artifact
+            art = get_artifact(verified=False)  # keyed on the fingerprint below; stays DB-free
+            _grid = art.wp_grid if art is not None else None
+        _grid_loaded = True
+    if _grid is not None and _grid.fingerprint == model.fingerprint():
+        return _grid
+    return None
+
+def set_grid(grid: Optional[WPGrid]):
+    global _grid, _grid_loaded
+    _grid, _grid_loaded = grid, True
+
+@dataclass
+class LiveState:
+    seconds_left: int
+    score_home: int
+    score_away: int
+    possession: str = "home"
+    yardline: int = 75
+    timeouts_home: int = 3
+    timeouts_away: int = 3
+
+def _grid_lookup(grid: WPGrid, model: BaseDriveModel, home: TeamState, away: TeamState,
+                 s: LiveState, rd: float) -> Optional[float]:
+    diff = s.score_home - s.score_away
+    if s.seconds_left <= 0:
+        return 1.0 if diff > 0 else 0.0 if diff < 0 else (grid.at(0, 0, True, rd) if grid.covers(0, 0, rd) else None)
+    if abs(diff) > MAX_LOOKUP_DIFF or not grid.covers(s.seconds_left, diff, rd):
+        return None
+    home_ball = s.possession == "home"
+    off, de = (home, away) if home_ball else (away, home)
+    probs = model.probs(to_features(DriveContext(
+        yardline=s.yardline, seconds_left=s.seconds_left,
+        score_diff=diff if home_ball else -diff,
+        off_rush=off.off_rush, off_pass=off.off_pass, def_rush=de.def_rush, def_pass=de.def_pass,
+        st=(off.st + de.st)/2,
+        timeouts_off=s.timeouts_home if home_ball else s.timeouts_away,
+        timeouts_def=s.timeouts_away if home_ball else s.timeouts_home,
+    )))
+    sign = 1 if home_ball else -1
+    wp = 0.0
+    for k, result, points, seconds in _OUTCOMES:
+        after = 0 if k == ENDHALF else max(0, s.seconds_left - seconds)
+        d = diff + sign * points
+        if after == 0 and d != 0:
+            v = 1.0 if d > 0 else 0.0
+        else:
+            v = grid.at(after, d, not home_ball, rd)
+        wp += probs[result] * v
+    return wp
+
+def win_probability(model: BaseDriveModel, home: TeamState, away: TeamState, state: LiveState,
+                    n_fallback: int = 2000, seed: int | None = None) -> Dict[str, Any]:
+    rd = rating_diff(home, away)
+    grid = current_grid(model)
+    if grid is not None:
+        wp = _grid_lookup(grid, model, home, away, state, rd)
+        if wp is not None:
+            return {"home_win_prob": wp, "away_win_prob": 1 - wp, "source": "grid", "rating_diff": rd}
+    start = StartState(seconds_left=max(0, state.seconds_left), score_home=state.score_home,
+                       score_away=state.score_away, home_ball=state.possession == "home",
+                       yardline=state.yardline, timeouts_home=state.timeouts_home, timeouts_away=state.timeouts_away)
+    out = simulate(model, home, away, n_fallback, seed=seed, start=start)
+    wp = float((out.score_home > out.score_away).mean())
+    return {"home_win_prob": wp, "away_win_prob": 1 - wp, "source": "simulation", "rating_diff": rd,
+            "samples": n_fallback, "stderr": math.sqrt(wp * (1 - wp) / n_fallback)}
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Build the live win-probability grid")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build")
+    b.add_argument("--n", type=int, default=200, help="simulated games per grid cell")
+    b.add_argument("--seed", type=int, default=0)
+    b.add_argument("--out", default=GRID_PATH)
+    args = ap.parse_args(argv)
+    from .sim_engine import default_drive_model
+    grid = build_grid(default_drive_model(), n_per_cell=args.n, seed=args.seed)
+    save_grid(grid, args.out)
+    print({"path": args.out, "shape": list(grid.wp.shape), **grid.meta})
+
+if __name__ == "__main__":
+    main()
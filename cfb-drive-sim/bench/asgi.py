@@ -0,0 +1,66 @@
+"""Minimal in-process ASGI client for benchmarks.
+
+Calls the app directly (no sockets, no httpx) so timings measure the app itself
+and the harness does not pull extra modules into the process it is measuring.
+"""
+import asyncio
+import json
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlencode
+
+async def request_async(app, method: str, path: str, json_body: Any = None,
+                        params: Optional[Dict[str, Any]] = None,
+                        headers: Optional[Dict[str, str]] = None) -> Tuple[int, Dict[str, str], bytes]:
+    body = b"" if json_body is None else json.dumps(json_body).encode()
+    hdrs = [(b"host", b"bench")]
+    if json_body is not None:
+        hdrs.append((b"content-type", b"application/json"))
+        hdrs.append((b"content-length", str(len(body)).encode()))
+    for k, v in (headers or {}).items():
+        hdrs.append((k.lower().encode(), str(v).encode()))
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method.upper(),
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": urlencode(params or {}).encode(),
+        "root_path": "",
+        "headers": hdrs,
+        "client": ("127.0.0.1", 0),
+        "server": ("bench", 80),
+    }
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return {"type": "http.disconnect"}
+
+    status = 0
+    resp_headers: Dict[str, str] = {}
+    chunks = []
+
+    async def send(msg):
+        nonlocal status
+        if msg["type"] == "http.response.start":
+            status = msg["status"]
+            resp_headers.update({k.decode(): v.decode() for k, v in msg.get("headers", [])})
+        elif msg["type"] == "http.response.body":
+            chunks.append(msg.get("body", b""))
+
+    await app(scope, receive, send)
+    return status, resp_headers, b"".join(chunks)
+
+def request(app, method: str, path: str, **kw) -> Tuple[int, Dict[str, str], bytes]:
+    return asyncio.run(request_async(app, method, path, **kw))
+
+def request_json(app, method: str, path: str, **kw) -> Any:
+    status, _, body = request(app, method, path, **kw)
+    if status >= 400:
+        raise RuntimeError(f"{method} {path} -> {status}: {body[:200]!r}")
+    return json.loads(body)
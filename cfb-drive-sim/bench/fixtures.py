@@ -0,0 +1,104 @@
+"""Fixtures for the benchmark suite.
+
+- `synthetic_teams` / `seed_db`: a deterministic teams+games database so calibrate
+  and search benchmarks run without CFBD access.
+- `data/cfbd_games.json`: a CFBD `/games` response used to benchmark ingest. Re-record
+  it from the live API with
+
+      CFBD_API_KEY=... python -m bench.fixtures record --season 2024
+
+  (the committed copy is generated in the same response shape by `synthesize`).
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+GAMES_FIXTURE = os.path.join(FIXTURE_DIR, "cfbd_games.json")
+
+CONFERENCES = ["ACC", "Big 12", "Big Ten", "SEC", "Pac-12", "American Athletic",
+               "Conference USA", "Mid-American", "Mountain West", "Sun Belt", "FBS Independents"]
+
+def synthetic_teams(n: int = 134, seed: int = 7) -> list[dict]:
+    rng = random.Random(seed)
+    teams = []
+    for i in range(n):
+        off = rng.gauss(0, 60)
+        de = rng.gauss(0, 60)
+        teams.append({
+            "name": f"Team {i:03d}",
+            "conference": CONFERENCES[i % len(CONFERENCES)],
+            "off_rush": off, "off_pass": off,
+            "def_rush": de, "def_pass": de,
+            "st": rng.gauss(0, 5),
+        })
+    return teams
+
+def synthesize_games(season: int, teams: list[dict], games_per_team: int = 12, seed: int = 11) -> list[dict]:
+    """Games in the CFBD `/games` response shape (only the fields ingest reads, plus ids)."""
+    rng = random.Random(seed)
+    names = [t["name"] for t in teams]
+    out = []
+    gid = season * 10_000
+    for week in range(1, games_per_team + 1):
+        order = names[:]
+        rng.shuffle(order)
+        for h, a in zip(order[0::2], order[1::2]):
+            gid += 1
+            out.append({
+                "id": gid, "season": season, "week": week, "season_type": "regular",
+                "start_date": f"{season}-09-{min(28, week * 2):02d}T19:00:00.000Z",
+                "neutral_site": rng.random() < 0.05, "conference_game": False,
+                "home_team": h, "home_points": max(0, int(rng.gauss(29, 13))),
+                "away_team": a, "away_points": max(0, int(rng.gauss(26, 13))),
+            })
+    return out
+
+def seed_db(season: int = 2024, seed: int = 7) -> int:
+    """Create tables and fill teams + one season of games. Expects an empty DB."""
+    from app.db import SessionLocal
+    from app.ingest import init_db
+    from app.models import Team, Game
+    init_db()
+    teams = synthetic_teams(seed=seed)
+    with SessionLocal() as sess:
+        objs = [Team(**t) for t in teams]
+        sess.add_all(objs)
+        sess.flush()
+        ids = {t.name: t.team_id for t in objs}
+        games = synthesize_games(season, teams, seed=seed + 1)
+        sess.add_all(Game(season=g["season"], week=g["week"], date=g["start_date"],
+                          neutral=1 if g["neutral_site"] else 0,
+                          home_id=ids[g["home_team"]], away_id=ids[g["away_team"]],
+                          home_pts=g["home_points"], away_pts=g["away_points"]) for g in games)
+        sess.commit()
+    return len(games)
+
+def load_games_fixture() -> list[dict]:
+    with open(GAMES_FIXTURE) as f:
+        return json.load(f)
+
+async def _record(season: int) -> list[dict]:
+    from app.cfbd import get as cfbd_get
+    return await cfbd_get("/games", params={"year": season})
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Manage benchmark fixtures")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    rec = sub.add_parser("record", help="record a live CFBD /games response")
+    rec.add_argument("--season", type=int, required=True)
+    syn = sub.add_parser("synthesize", help="write a synthetic /games response")
+    syn.add_argument("--season", type=int, default=2023)
+    args = ap.parse_args(argv)
+    if args.cmd == "record":
+        data = asyncio.run(_record(args.season))
+    else:
+        data = synthesize_games(args.season, synthetic_teams(), seed=23)
+    with open(GAMES_FIXTURE, "w") as f:
+        json.dump(data, f, separators=(",", ":"))
+    print(f"wrote {len(data)} games to {GAMES_FIXTURE}")
+
+if __name__ == "__main__":
+    main()
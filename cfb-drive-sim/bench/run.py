@@ -0,0 +1,276 @@
+"""Benchmark suite for the simulator, series endpoints, calibration and ingest.
+
+Runs against a throwaway SQLite DB seeded with synthetic teams/games (see
+`bench.fixtures`), writes machine-readable results and optionally compares them
+against a stored baseline. Run from the backend folder:
+
+    python -m bench.run                              # full suite -> bench/results.json
+    python -m bench.run --quick                      # small sizes, for local iteration
+    python -m bench.run --only series                # regex filter on case names
+    python -m bench.run --save-baseline              # store results as bench/baseline.json
+    python -m bench.run --quick --compare            # against the committed bench/baseline.json
+    python -m bench.run --compare bench/baseline.json --threshold 0.15
+
+With `--compare` the exit status is 1 when any case is slower than the baseline
+by more than the threshold (a per-case value in the baseline's "thresholds"
+mapping overrides the global one). Baselines are machine specific: record them
+on the same hardware that runs the comparison. The committed baseline is a
+`--quick` run; its "meta" records the machine it came from.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_OUT = os.path.join(HERE, "results.json")
+DEFAULT_BASELINE = os.path.join(HERE, "baseline.json")
+
+SEASON = 2024          # synthetic season seeded into the DB (calibrate/search)
+
+HOME = {"name": "Home U", "off_rush": 20, "off_pass": 20, "def_rush": 10, "def_pass": 10, "st": 0}
+AWAY = {"name": "Away Tech", "off_rush": 10, "off_pass": 10, "def_rush": 20, "def_pass": 20, "st": 0}
+
+def _timed(fn, repeat: int):
+    """Best-of-`repeat` wall time in seconds plus the last return value."""
+    best = float("inf")
+    out = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+def _result(seconds: float, rate: float, unit: str, **extra) -> dict:
+    return {"seconds": seconds, "rate": rate, "unit": unit, **extra}
+
+# --- cases ---
+
+def bench_sim_game(games: int, repeat: int) -> dict:
+    from app.sim_engine import Simulator, TeamState, GameState
+    sim = Simulator()
+    drives = 0
+    sample = sim.model.sample
+
+    def counting_sample(probs):
+        nonlocal drives
+        drives += 1
+        return sample(probs)
+
+    sim.model.sample = counting_sample
+
+    def run():
+        nonlocal drives
+        drives = 0
+        for i in range(games):
+            sim.sim_game(GameState(home=TeamState(**HOME), away=TeamState(**AWAY)), seed=i)
+        return drives
+
+    secs, n_drives = _timed(run, repeat)
+    return _result(secs, n_drives / secs, "drives/s", games=games, drives=n_drives,
+                   games_per_s=games / secs)
+
+def bench_series(app, n: int, repeat: int) -> dict:
+    from bench.asgi import request_json
+    body = {"home": HOME, "away": AWAY, "n": n, "seed": 1}
+    secs, out = _timed(lambda: request_json(app, "POST", "/simulate-series", json_body=body), repeat)
+    return _result(secs, n / secs, "games/s", n=n, home_win_pct=out["home_win_pct"])
+
+def bench_series_batch(app, n: int, repeat: int) -> dict:
+    from bench.asgi import request_json
+    body = {"home": HOME, "away": AWAY, "n": n, "seed": 1, "engine": "batch"}
+    secs, out = _timed(lambda: request_json(app, "POST", "/simulate-series", json_body=body), repeat)
+    return _result(secs, n / secs, "games/s", n=n, home_win_pct=out["home_win_pct"])
+
+def bench_calibrate(samples: int, repeat: int) -> dict:
+    from app.calibrate import run as calibrate_run
+    secs, out = _timed(lambda: calibrate_run(season=SEASON, samples=samples, seed=3), repeat)
+    return _result(secs, 1.0 / secs, "runs/s", samples=samples, coef_scale=out.get("coef_scale"))
+
+def bench_ingest(repeat: int) -> dict:
+    """Cold (insert) and warm (upsert existing) passes over the recorded /games fixture."""
+    from sqlalchemy import delete
+    from app import ingest
+    from app.db import SessionLocal
+    from app.models import Game
+    from bench.fixtures import load_games_fixture
+
+    data = load_games_fixture()
+    # The season and ids come from the fixture, so a re-recorded one (any season) still
+    # clears exactly its own games before each cold pass and leaves the synthetic season alone.
+    season = data[0]["season"]
+    ids = [g["id"] for g in data]
+
+    async def fake_get(path, params=None):
+        return data
+
+    real_get = ingest.cfbd_get
+    ingest.cfbd_get = fake_get
+    try:
+        def clear():
+            with SessionLocal() as sess:
+                for i in range(0, len(ids), 500):
+                    sess.execute(delete(Game).where(Game.cfbd_id.in_(ids[i:i + 500])))
+                sess.commit()
+
+        def count():
+            from sqlalchemy import func, select
+            with SessionLocal() as sess:
+                return sess.execute(select(func.count()).select_from(Game)).scalar_one()
+
+        cold = float("inf")
+        for _ in range(repeat):
+            clear()
+            before = count()
+            t0 = time.perf_counter()
+            asyncio.run(ingest.fetch_and_store_games(season=season))
+            cold = min(cold, time.perf_counter() - t0)
+            inserted = count() - before
+        warm, _ = _timed(lambda: asyncio.run(ingest.fetch_and_store_games(season=season)), repeat)
+    finally:
+        ingest.cfbd_get = real_get
+    return {
+        "ingest_games_cold": _result(cold, len(data) / cold, "games/s", games=len(data), inserted=inserted),
+        "ingest_games_warm": _result(warm, len(data) / warm, "games/s", games=len(data)),
+    }
+
+def bench_teams_search(app, requests: int, repeat: int) -> dict:
+    from bench.asgi import request_json
+    queries = ["", "Team 0", "Team 1", "07", "zzz"]
+
+    def run():
+        for i in range(requests):
+            request_json(app, "GET", "/teams/search", params={"q": queries[i % len(queries)]})
+
+    secs, _ = _timed(run, repeat)
+    return _result(secs, requests / secs, "req/s", requests=requests)
+
+# --- suite ---
+
+def plan(quick: bool) -> list[tuple[str, callable]]:
+    series_sizes = [1_000, 10_000] if quick else [1_000, 100_000, 1_000_000]
+
+    def lazy_app():
+        import index
+        return index.app
+
+    cases = [("sim_game", lambda: bench_sim_game(games=500 if quick else 5_000, repeat=3))]
+    for n in series_sizes:
+        cases.append((f"series_n{n}", lambda n=n: bench_series(lazy_app(), n, repeat=3 if n <= 10_000 else 1)))
+    batch_n = 100_000 if quick else 1_000_000
+    cases.append((f"series_batch_n{batch_n}", lambda: bench_series_batch(lazy_app(), batch_n, repeat=1 if quick else 3)))
+    cases += [
+        ("calibrate", lambda: bench_calibrate(samples=200 if quick else 2_000, repeat=1)),
+        ("ingest_games", lambda: bench_ingest(repeat=1 if quick else 3)),
+        ("teams_search", lambda: bench_teams_search(lazy_app(), requests=100 if quick else 500, repeat=3)),
+    ]
+    return cases
+
+def _git_rev() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+def run_suite(quick: bool, only: str | None) -> dict:
+    results = {}
+    for name, fn in plan(quick):
+        if only and not re.search(only, name):
+            continue
+        print(f"[bench] {name} ...", file=sys.stderr, flush=True)
+        out = fn()
+        # cases either return one result or a mapping of named sub-results
+        if "seconds" in out:
+            results[name] = out
+        else:
+            results.update(out)
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git": _git_rev(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "quick": quick,
+        },
+        "results": results,
+    }
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[dict]:
+    """Rows for every case present in both runs; `regressed` when the rate dropped past threshold."""
+    limits = baseline.get("thresholds", {})
+    rows = []
+    for name, cur in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            continue
+        limit = float(limits.get(name, threshold))
+        change = cur["rate"] / base["rate"] - 1.0
+        rows.append({"case": name, "unit": cur["unit"], "baseline": base["rate"], "current": cur["rate"],
+                     "change": change, "threshold": limit, "regressed": change < -limit})
+    return rows
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Run the benchmark suite")
+    ap.add_argument("--quick", action="store_true", help="small sizes (skips the 100k/1M series)")
+    ap.add_argument("--only", default=None, help="regex; run only matching case names")
+    ap.add_argument("--out", default=DEFAULT_OUT)
+    ap.add_argument("--compare", nargs="?", const=DEFAULT_BASELINE, default=None,
+                    help=f"baseline JSON to compare against (default {DEFAULT_BASELINE})")
+    ap.add_argument("--threshold", type=float, default=0.15, help="allowed fractional slowdown")
+    ap.add_argument("--save-baseline", action="store_true", help=f"also write results to {DEFAULT_BASELINE}")
+    args = ap.parse_args(argv)
+    if args.compare and not os.path.exists(args.compare):
+        print(f"[bench] no baseline at {args.compare}; record one with --save-baseline "
+              f"(on the machine that runs the comparison)", file=sys.stderr)
+        return 2
+
+    # Point the app at a fresh synthetic DB before anything imports app.db.
+    tmp = tempfile.mkdtemp(prefix="cfb_bench_")
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tmp, "bench.sqlite3")
+    from bench.fixtures import seed_db
+    seed_db(season=SEASON)
+
+    report = run_suite(args.quick, args.only)
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    if args.save_baseline:
+        saved = dict(report)
+        if os.path.exists(DEFAULT_BASELINE):  # keep hand-tuned per-case thresholds
+            with open(DEFAULT_BASELINE) as f:
+                saved["thresholds"] = json.load(f).get("thresholds", {})
+        with open(DEFAULT_BASELINE, "w") as f:
+            json.dump(saved, f, indent=2)
+
+    for name, r in report["results"].items():
+        print(f"{name:22s} {r['rate']:14.1f} {r['unit']:9s} ({r['seconds']:.3f}s)")
+
+    if not args.compare:
+        return 0
+    with open(args.compare) as f:
+        baseline = json.load(f)
+    base_meta = baseline.get("meta", {})
+    if base_meta.get("quick") != args.quick:
+        print(f"[bench] note: baseline quick={base_meta.get('quick')} but this run quick={args.quick}; "
+              f"case sizes differ", file=sys.stderr)
+    rows = compare(report, baseline, args.threshold)
+    report["comparison"] = rows
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print()
+    for r in rows:
+        flag = "REGRESSION" if r["regressed"] else "ok"
+        print(f"{r['case']:22s} {r['change']:+7.1%}  (limit -{r['threshold']:.0%})  {flag}")
+    return 1 if any(r["regressed"] for r in rows) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""Cold-start harness: import time and first-request latency of the entrypoint.
+
+Each run happens in a fresh interpreter so module caches are cold, mirroring a
+serverless cold start. Run from the backend folder:
+
+    python -m bench.startup                    # median of 5 runs, human readable
+    python -m bench.startup --json             # machine-readable
+    python -m bench.startup --max-import-ms 300 --max-first-ms 150   # CI gate
+
+The route hit by the first request defaults to a DB-free `/simulate-game`; the
+report also lists which heavy modules (SQLAlchemy, httpx) were imported, since
+those should only load once a DB/CFBD-backed route is called. On DB-free routes
+the run fails if the first request imports them (`--forbid-import` overrides
+the list; pass it with no modules to disable the check). Those routes are only
+DB-free when the model's coef_scale is known without the DB (MODEL_COEF_SCALE or
+an artifact bundle), so the child gets MODEL_COEF_SCALE=1.0 unless one is set;
+without either, the first simulation reads it from model_params.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+HEAVY_MODULES = ["sqlalchemy", "httpx", "numpy"]
+# Routes that must serve a cold start without the DB or CFBD clients.
+DB_FREE_ROUTES = {"/simulate-game", "/win-probability", "/win-probability/batch", "/sweep"}
+DB_MODULES = ["sqlalchemy", "httpx"]
+
+SAMPLE_GAME = {
+    "home": {"name": "Home U", "off_rush": 20, "off_pass": 20, "def_rush": 10, "def_pass": 10, "st": 0},
+    "away": {"name": "Away Tech", "off_rush": 10, "off_pass": 10, "def_rush": 20, "def_pass": 20, "st": 0},
+    "seed": 1,
+}
+
+_CHILD = r"""
+import json, sys, time
+t0 = time.perf_counter()
+import index
+t1 = time.perf_counter()
+after_import = {m: m in sys.modules for m in HEAVY}
+from bench.asgi import request
+status, _, _ = request(index.app, METHOD, PATH, json_body=BODY)
+t2 = time.perf_counter()
+request(index.app, METHOD, PATH, json_body=BODY)
+t3 = time.perf_counter()
+print(json.dumps({
+    "import_ms": (t1 - t0) * 1000,
+    "first_request_ms": (t2 - t1) * 1000,
+    "warm_request_ms": (t3 - t2) * 1000,
+    "status": status,
+    "imported_at_startup": after_import,
+    "imported_after_request": {m: m in sys.modules for m in HEAVY},
+}))
+"""
+
+def run_once(method: str, path: str, body, modules=HEAVY_MODULES) -> dict:
+    here = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    env.setdefault("MODEL_COEF_SCALE", "1.0")
+    env.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.gettempdir(), "cfb_startup_bench.sqlite3"))
+    code = (f"HEAVY = {list(modules)!r}\nMETHOD = {method!r}\nPATH = {path!r}\nBODY = {body!r}\n") + _CHILD
+    out = subprocess.run([sys.executable, "-c", code], cwd=here, env=env, capture_output=True, text=True)
+    if out.returncode != 0:
+        raise RuntimeError(out.stderr.strip())
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--method", default="POST")
+    ap.add_argument("--path", default="/simulate-game")
+    ap.add_argument("--body", default=None, help="JSON body (default: sample /simulate-game matchup)")
+    ap.add_argument("--json", action="store_true", help="print the report as JSON")
+    ap.add_argument("--max-import-ms", type=float, default=None)
+    ap.add_argument("--max-first-ms", type=float, default=None)
+    ap.add_argument("--forbid-import", nargs="*", default=None, metavar="MODULE",
+                    help="fail if the first request imports these (default: sqlalchemy, httpx on DB-free routes)")
+    args = ap.parse_args(argv)
+    forbidden = args.forbid_import if args.forbid_import is not None else \
+        (DB_MODULES if args.path in DB_FREE_ROUTES else [])
+
+    body = json.loads(args.body) if args.body else (SAMPLE_GAME if args.path == "/simulate-game" else None)
+    modules = HEAVY_MODULES + [m for m in forbidden if m not in HEAVY_MODULES]
+    runs = [run_once(args.method, args.path, body, modules) for _ in range(args.runs)]
+    report = {
+        "route": f"{args.method} {args.path}",
+        "runs": args.runs,
+        "import_ms": statistics.median(r["import_ms"] for r in runs),
+        "first_request_ms": statistics.median(r["first_request_ms"] for r in runs),
+        "warm_request_ms": statistics.median(r["warm_request_ms"] for r in runs),
+        "status": runs[-1]["status"],
+        "imported_at_startup": runs[-1]["imported_at_startup"],
+        "imported_after_request": runs[-1]["imported_after_request"],
+    }
+    failures = []
+    if args.max_import_ms is not None and report["import_ms"] > args.max_import_ms:
+        failures.append(f"import {report['import_ms']:.1f}ms > {args.max_import_ms}ms")
+    if args.max_first_ms is not None and report["first_request_ms"] > args.max_first_ms:
+        failures.append(f"first request {report['first_request_ms']:.1f}ms > {args.max_first_ms}ms")
+    for m in forbidden:
+        if any(r["imported_after_request"].get(m) for r in runs):
+            failures.append(f"{m} imported by the first request to {args.path}")
+    report["failures"] = failures
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{report['route']}  (median of {args.runs} cold runs, status {report['status']})")
+        print(f"  import:        {report['import_ms']:8.1f} ms")
+        print(f"  first request: {report['first_request_ms']:8.1f} ms")
+        print(f"  warm request:  {report['warm_request_ms']:8.1f} ms")
+        loaded = [m for m, v in report["imported_at_startup"].items() if v]
+        print(f"  heavy modules at startup: {', '.join(loaded) or 'none'}")
+        loaded = [m for m, v in report["imported_after_request"].items() if v]
+        print(f"  heavy modules after first request: {', '.join(loaded) or 'none'}")
+        for f in failures:
+            print("  REGRESSION:", f)
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -15,6 +15,7 @@ CREATE TABLE IF NOT EXISTS teams (
 
 CREATE TABLE IF NOT EXISTS games (
   game_id INTEGER PRIMARY KEY,
+  cfbd_id INTEGER UNIQUE,
   season INTEGER NOT NULL,
   week INTEGER,
   date TEXT,
@@ -30,10 +31,13 @@ CREATE TABLE IF NOT EXISTS games (
 
 CREATE TABLE IF NOT EXISTS drives (
   id INTEGER PRIMARY KEY,
+  cfbd_id TEXT UNIQUE,
   game_id INTEGER NOT NULL,
   offense_id INTEGER NOT NULL,
   defense_id INTEGER NOT NULL,
   start_yardline INTEGER,
+  start_seconds_left INTEGER,
+  start_score_diff INTEGER,
   result TEXT,
   points INTEGER DEFAULT 0,
   seconds INTEGER DEFAULT 0,
@@ -51,3 +55,31 @@ CREATE TABLE IF NOT EXISTS ratings_history (
   value REAL NOT NULL,
   FOREIGN KEY(team_id) REFERENCES teams(team_id)
 );
+
+-- Simulated drives captured by series traces (trace=db). Simulated games have no
+-- row in games, so they are kept out of drives.
+CREATE TABLE IF NOT EXISTS sim_drives (
+  id INTEGER PRIMARY KEY,
+  trace_id TEXT NOT NULL,
+  game_idx INTEGER NOT NULL,
+  side INTEGER NOT NULL,
+  offense_id INTEGER,
+  defense_id INTEGER,
+  start_yardline INTEGER,
+  result TEXT,
+  points INTEGER DEFAULT 0,
+  seconds INTEGER DEFAULT 0,
+  FOREIGN KEY(offense_id) REFERENCES teams(team_id),
+  FOREIGN KEY(defense_id) REFERENCES teams(team_id)
+);
+CREATE INDEX IF NOT EXISTS ix_sim_drives_trace_id ON sim_drives(trace_id);
+
+-- Columns added to existing tables after the first schema (CREATE TABLE IF NOT EXISTS
+-- leaves old tables alone). app.ingest.init_db applies these idempotently; for a DB
+-- created from the first schema run them once by hand otherwise:
+-- ALTER TABLE games ADD COLUMN cfbd_id INTEGER;
+-- CREATE UNIQUE INDEX IF NOT EXISTS ux_games_cfbd_id ON games(cfbd_id);
+-- ALTER TABLE drives ADD COLUMN cfbd_id TEXT;
+-- ALTER TABLE drives ADD COLUMN start_seconds_left INTEGER;
+-- ALTER TABLE drives ADD COLUMN start_score_diff INTEGER;
+-- CREATE UNIQUE INDEX IF NOT EXISTS ux_drives_cfbd_id ON drives(cfbd_id);